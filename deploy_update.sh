@@ -41,20 +41,30 @@ git fetch origin
 git reset --hard "origin/$GIT_BRANCH"
 info "Código actualizado a la última versión de '$GIT_BRANCH'."
 
-# ── 2. Migración de la Base de Datos ─────────────────────────
-MIGRATION_FILE="$APP_DIR/migrations/001_mercadopago.sql"
-if [ -f "$MIGRATION_FILE" ]; then
-    info "Ejecutando migración de Mercado Pago..."
-    sudo -u "$DB_USER" psql -d "$DB_NAME" -f "$MIGRATION_FILE" 2>&1 || warn "Migración ya aplicada o con advertencias (normal si se corre dos veces)."
-    info "Migración completada."
+# ── 2. Migraciones de la Base de Datos ───────────────────────
+# Todas las migraciones son idempotentes (IF [NOT] EXISTS), se aplican en orden.
+shopt -s nullglob
+MIGRATIONS=("$APP_DIR"/migrations/*.sql)
+if [ ${#MIGRATIONS[@]} -gt 0 ]; then
+    for MIGRATION_FILE in "${MIGRATIONS[@]}"; do
+        info "Ejecutando migración $(basename "$MIGRATION_FILE")..."
+        sudo -u "$DB_USER" psql -d "$DB_NAME" -f "$MIGRATION_FILE" 2>&1 || warn "Migración ya aplicada o con advertencias (normal si se corre dos veces)."
+    done
+    info "Migraciones completadas."
 else
-    warn "No se encontró archivo de migración en $MIGRATION_FILE, saltando..."
+    warn "No se encontraron migraciones en $APP_DIR/migrations, saltando..."
 fi
 
 # ── 3. Compilar el binario ────────────────────────────────────
 info "Compilando la API..."
 cd "$APP_DIR"
-go build -o "$BINARY_NAME" ./main.go || fail "Error de compilación"
+# Si existe default.pgo (perfil de CPU de producción, ver PPROF_ADDR en el
+# README) el compilador lo usa para optimizar guiado por perfil (PGO):
+# inlining y devirtualización de las rutas realmente calientes.
+if [ -f "$APP_DIR/default.pgo" ]; then
+    info "Usando perfil default.pgo para PGO."
+fi
+go build -pgo=auto -o "$BINARY_NAME" . || fail "Error de compilación"
 info "Binario '$BINARY_NAME' compilado exitosamente."
 
 # Restaurar permisos al usuario 'ubuntu' para evitar problemas con git pull futuros
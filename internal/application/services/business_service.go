@@ -2,6 +2,7 @@ package services
 
 import (
 	"context"
+	"errors"
 	"fmt"
 
 	"github.com/google/uuid"
@@ -28,10 +29,24 @@ type CreateDeliveryPointInput struct {
 	Longitude  float64
 }
 
+// CreateDeliveryPointsInput agrega varios puntos a un mismo negocio.
+type CreateDeliveryPointsInput struct {
+	BusinessID string
+	OwnerID    string
+	Points     []DeliveryPointData
+}
+
+type DeliveryPointData struct {
+	Name      string
+	Latitude  float64
+	Longitude float64
+}
+
 type NearbyInput struct {
 	Lat      float64
 	Lng      float64
 	RadiusKm float64
+	Limit    int // 0 = todos los del radio
 }
 
 // ----- Puerto de entrada -----
@@ -42,6 +57,7 @@ type BusinessService interface {
 	GetByOwner(ctx context.Context, ownerID string) ([]*business.Business, error)
 	GetNearby(ctx context.Context, in NearbyInput) ([]*business.Business, error)
 	AddDeliveryPoint(ctx context.Context, in CreateDeliveryPointInput) (*business.DeliveryPoint, error)
+	AddDeliveryPoints(ctx context.Context, in CreateDeliveryPointsInput) ([]*business.DeliveryPoint, error)
 	Delete(ctx context.Context, id, ownerID string) error
 }
 
@@ -88,7 +104,7 @@ func (s *businessService) GetNearby(ctx context.Context, in NearbyInput) ([]*bus
 	if radius == 0 {
 		radius = 5
 	}
-	return s.repo.FindNearby(ctx, in.Lat, in.Lng, radius)
+	return s.repo.FindNearby(ctx, in.Lat, in.Lng, radius, in.Limit)
 }
 
 func (s *businessService) AddDeliveryPoint(ctx context.Context, in CreateDeliveryPointInput) (*business.DeliveryPoint, error) {
@@ -114,16 +130,38 @@ func (s *businessService) AddDeliveryPoint(ctx context.Context, in CreateDeliver
 	return dp, nil
 }
 
-func (s *businessService) Delete(ctx context.Context, id, ownerID string) error {
-	b, err := s.repo.FindByID(ctx, id)
+func (s *businessService) AddDeliveryPoints(ctx context.Context, in CreateDeliveryPointsInput) ([]*business.DeliveryPoint, error) {
+	b, err := s.repo.FindByID(ctx, in.BusinessID)
 	if err != nil {
-		return err
+		return nil, err
 	}
-	if !b.OwnedBy(ownerID) {
-		return business.ErrUnauthorized
+	if !b.OwnedBy(in.OwnerID) {
+		return nil, business.ErrUnauthorized
+	}
+
+	dps := make([]*business.DeliveryPoint, len(in.Points))
+	for i, p := range in.Points {
+		dps[i] = &business.DeliveryPoint{
+			ID:         uuid.NewString(),
+			BusinessID: in.BusinessID,
+			Name:       p.Name,
+			Latitude:   p.Latitude,
+			Longitude:  p.Longitude,
+			Active:     true,
+		}
+	}
+	if err := s.repo.SaveDeliveryPoints(ctx, dps); err != nil {
+		return nil, fmt.Errorf("businessService.AddDeliveryPoints: %w", err)
 	}
-	b.Active = false
-	if err := s.repo.Update(ctx, b); err != nil {
+	return dps, nil
+}
+
+func (s *businessService) Delete(ctx context.Context, id, ownerID string) error {
+	err := s.repo.DeleteOwned(ctx, id, ownerID)
+	if errors.Is(err, business.ErrNotFound) || errors.Is(err, business.ErrUnauthorized) {
+		return err
+	}
+	if err != nil {
 		return fmt.Errorf("businessService.Delete: %w", err)
 	}
 	return nil
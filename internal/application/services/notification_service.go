@@ -20,9 +20,12 @@ type NotificationService interface {
 	SendPushNotification(userID, title, body string)
 }
 
+// El cliente de messaging se crea una sola vez: app.Messaging arma un
+// cliente HTTP y una fuente de tokens OAuth nuevos en cada llamada, así que
+// crearlo por notificación repetía el handshake TLS y la obtención del token.
 type notificationService struct {
-	repo FCMRepository
-	app  *firebase.App
+	repo   FCMRepository
+	client *messaging.Client
 }
 
 func NewNotificationService(repo FCMRepository, credsFilePath string) (NotificationService, error) {
@@ -31,7 +34,11 @@ func NewNotificationService(repo FCMRepository, credsFilePath string) (Notificat
 	if err != nil {
 		return nil, fmt.Errorf("error initializing firebase app: %w", err)
 	}
-	return &notificationService{repo: repo, app: app}, nil
+	client, err := app.Messaging(context.Background())
+	if err != nil {
+		return nil, fmt.Errorf("error initializing firebase messaging: %w", err)
+	}
+	return &notificationService{repo: repo, client: client}, nil
 }
 
 func (s *notificationService) SaveFCMToken(ctx context.Context, userID, token string) error {
@@ -47,12 +54,6 @@ func (s *notificationService) SendPushNotification(userID, title, body string) {
 			return
 		}
 		
-		client, err := s.app.Messaging(bgCtx)
-		if err != nil {
-			log.Printf("SendPushNotification: messaging client error: %v", err)
-			return
-		}
-		
 		msg := &messaging.Message{
 			Token: token,
 			Notification: &messaging.Notification{
@@ -61,12 +62,8 @@ func (s *notificationService) SendPushNotification(userID, title, body string) {
 			},
 		}
 		
-		response, err := client.Send(bgCtx, msg)
-		if err != nil {
+		if _, err := s.client.Send(bgCtx, msg); err != nil {
 			log.Printf("SendPushNotification: failed to send message to user %s: %v", userID, err)
-			return
 		}
-		
-		log.Printf("SendPushNotification: successfully sent message ID %s to user %s", response, userID)
 	}()
 }
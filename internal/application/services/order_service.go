@@ -2,6 +2,7 @@ package services
 
 import (
 	"context"
+	"errors"
 	"fmt"
 	"log"
 	"time"
@@ -35,8 +36,8 @@ type CreateOrderInput struct {
 type OrderService interface {
 	CreateOrder(ctx context.Context, in CreateOrderInput) (*order.Order, error)
 	GetByID(ctx context.Context, id, userID string) (*order.Order, error)
-	GetByBuyer(ctx context.Context, buyerID string) ([]*order.Order, error)
-	GetByBusiness(ctx context.Context, businessID, sellerID string) ([]*order.Order, error)
+	GetByBuyer(ctx context.Context, buyerID string, page order.Page) ([]*order.Order, error)
+	GetByBusiness(ctx context.Context, businessID, sellerID string, page order.Page) ([]*order.Order, error)
 	MarkReady(ctx context.Context, id, sellerID string) (*order.Order, error)
 	// ScanQR lo llama el vendedor para confirmar entrega.
 	ScanQR(ctx context.Context, qrCode, sellerID string) (*order.Order, error)
@@ -79,12 +80,25 @@ func (s *orderService) CreateOrder(ctx context.Context, in CreateOrderInput) (*o
 		return nil, err
 	}
 
-	// Construir items y verificar stock
+	// Construir items y verificar stock (todos los productos en una consulta)
+	ids := make([]string, len(in.Items))
+	for i, it := range in.Items {
+		ids[i] = it.ProductID
+	}
+	products, err := s.productRepo.FindByIDs(ctx, ids)
+	if err != nil {
+		return nil, err
+	}
+	byID := make(map[string]*product.Product, len(products))
+	for _, p := range products {
+		byID[p.ID] = p
+	}
+
 	items := make([]order.Item, 0, len(in.Items))
 	for _, it := range in.Items {
-		p, err := s.productRepo.FindByID(ctx, it.ProductID)
-		if err != nil {
-			return nil, err
+		p, ok := byID[it.ProductID]
+		if !ok {
+			return nil, product.ErrNotFound
 		}
 		if !p.HasStock(it.Quantity) {
 			return nil, fmt.Errorf("%w: product %s", product.ErrNoStock, p.Name)
@@ -109,34 +123,22 @@ func (s *orderService) CreateOrder(ctx context.Context, in CreateOrderInput) (*o
 		order.Type(in.Type), items, in.DeliveryPointID, deadline)
 	
 	// Generar el código QR de manera incondicional, tal como lo requiere la app.
-	o.QRCode = uuid.NewString()
-
-	// Disminuir stock de forma atómica
-	for _, it := range items {
-		if err := s.productRepo.DecreaseStock(ctx, it.ProductID, it.Quantity); err != nil {
-			return nil, err
-		}
-	}
+	o.QRCode = s.qrSvc.NewToken()
 
 	// El estatus para online y reserved inicia en pendiente por defecto.
 
-	if err := s.orderRepo.Save(ctx, o); err != nil {
-		return nil, fmt.Errorf("orderService.CreateOrder save: %w", err)
-	}
-	for i := range items {
-		items[i].OrderID = o.ID
-	}
-	if err := s.orderRepo.SaveItems(ctx, items); err != nil {
-		return nil, fmt.Errorf("orderService.CreateOrder saveItems: %w", err)
+	// Stock, orden e items se escriben juntos en una transacción.
+	if err := s.orderRepo.Place(ctx, o); err != nil {
+		if errors.Is(err, product.ErrNoStock) {
+			return nil, err
+		}
+		return nil, fmt.Errorf("orderService.CreateOrder place: %w", err)
 	}
 
-	o.Items = items
-
 	// Create Mercado Pago Preference
 	pref, err := s.paymentSvc.CreatePreference(ctx, o, b.OwnerID)
 	if err == nil && pref != nil {
 		o.InitPoint = pref.InitPoint
-		log.Printf("✅ ÉXITO MERCADO PAGO: Se generó el link: %s", o.InitPoint)
 	} else if err != nil {
 		log.Printf("⚠️ SILENT ERROR: CreatePreference failed for Order %s: %v", o.ID, err)
 	}
@@ -163,11 +165,11 @@ func (s *orderService) GetByID(ctx context.Context, id, userID string) (*order.O
 	return o, nil
 }
 
-func (s *orderService) GetByBuyer(ctx context.Context, buyerID string) ([]*order.Order, error) {
-	return s.orderRepo.FindByBuyer(ctx, buyerID)
+func (s *orderService) GetByBuyer(ctx context.Context, buyerID string, page order.Page) ([]*order.Order, error) {
+	return s.orderRepo.FindByBuyer(ctx, buyerID, page)
 }
 
-func (s *orderService) GetByBusiness(ctx context.Context, businessID, sellerID string) ([]*order.Order, error) {
+func (s *orderService) GetByBusiness(ctx context.Context, businessID, sellerID string, page order.Page) ([]*order.Order, error) {
 	b, err := s.businessRepo.FindByID(ctx, businessID)
 	if err != nil {
 		return nil, err
@@ -175,7 +177,7 @@ func (s *orderService) GetByBusiness(ctx context.Context, businessID, sellerID s
 	if !b.OwnedBy(sellerID) {
 		return nil, order.ErrUnauthorized
 	}
-	return s.orderRepo.FindByBusiness(ctx, businessID)
+	return s.orderRepo.FindByBusiness(ctx, businessID, page)
 }
 
 func (s *orderService) MarkReady(ctx context.Context, id, sellerID string) (*order.Order, error) {
@@ -190,10 +192,11 @@ func (s *orderService) MarkReady(ctx context.Context, id, sellerID string) (*ord
 	if !b.OwnedBy(sellerID) {
 		return nil, order.ErrUnauthorized
 	}
+	from := o.Status
 	if err := o.MarkReady(); err != nil {
 		return nil, err
 	}
-	if err := s.orderRepo.Update(ctx, o); err != nil {
+	if err := s.orderRepo.Update(ctx, o, from); err != nil {
 		return nil, fmt.Errorf("orderService.MarkReady update: %w", err)
 	}
 
@@ -204,7 +207,20 @@ func (s *orderService) MarkReady(ctx context.Context, id, sellerID string) (*ord
 }
 
 func (s *orderService) ScanQR(ctx context.Context, qrCode, sellerID string) (*order.Order, error) {
-	o, err := s.orderRepo.FindByQRCode(ctx, qrCode)
+	// Camino normal: una sola sentencia entrega la orden.
+	o, err := s.orderRepo.ClaimDelivery(ctx, qrCode, sellerID)
+	if err == nil {
+		// Capture the authorized payment in Mercado Pago
+		_ = s.paymentSvc.CapturePayment(ctx, o.ID)
+		return o, nil
+	}
+	if !errors.Is(err, order.ErrNotFound) {
+		return nil, err
+	}
+
+	// No se pudo entregar: se lee la orden para saber por qué. El vencimiento
+	// se toma de la BD, con el mismo reloj con el que ClaimDelivery la rechazó.
+	o, expired, err := s.orderRepo.FindByQRCode(ctx, qrCode)
 	if err != nil {
 		return nil, err
 	}
@@ -217,25 +233,26 @@ func (s *orderService) ScanQR(ctx context.Context, qrCode, sellerID string) (*or
 		return nil, order.ErrUnauthorized
 	}
 
-	if o.IsExpired() {
-		_ = o.Cancel()
-		_ = s.orderRepo.Update(ctx, o)
-		// Reembolso parcial al comprador (sin comisión)
-		_ = s.paymentSvc.CancelPayment(ctx, o.ID)
-		return nil, order.ErrExpired
+	if expired {
+		cancelled, err := s.orderRepo.Cancel(ctx, o.ID)
+		if err != nil {
+			return nil, fmt.Errorf("orderService.ScanQR cancel: %w", err)
+		}
+		// Si ya estaba entregada o cancelada (p. ej. por el job de vencidas,
+		// que hace su propio reembolso) se sigue al error de estado.
+		if cancelled {
+			// Reembolso parcial al comprador (sin comisión)
+			_ = s.paymentSvc.CancelPayment(ctx, o.ID)
+			return nil, order.ErrExpired
+		}
 	}
 
 	if err := o.MarkDelivered(); err != nil {
 		return nil, err
 	}
-	if err := s.orderRepo.Update(ctx, o); err != nil {
-		return nil, fmt.Errorf("orderService.ScanQR update: %w", err)
-	}
-
-	// Capture the authorized payment in Mercado Pago
-	_ = s.paymentSvc.CapturePayment(ctx, o.ID)
-
-	return o, nil
+	// La orden pasó a 'ready' entre el UPDATE y la lectura; el cliente
+	// puede reintentar el escaneo.
+	return nil, order.ErrInvalidStatus
 }
 
 func (s *orderService) CancelOrder(ctx context.Context, id, userID string) (*order.Order, error) {
@@ -249,8 +266,15 @@ func (s *orderService) CancelOrder(ctx context.Context, id, userID string) (*ord
 	if err := o.Cancel(); err != nil {
 		return nil, err
 	}
-	if err := s.orderRepo.Update(ctx, o); err != nil {
-		return nil, err
+	// La cancelación y la devolución del stock van en una sola sentencia
+	// condicionada al estado; si otra petición se adelantó, no se repone
+	// nada dos veces.
+	cancelled, err := s.orderRepo.Cancel(ctx, o.ID)
+	if err != nil {
+		return nil, fmt.Errorf("orderService.CancelOrder: %w", err)
+	}
+	if !cancelled {
+		return nil, order.ErrInvalidStatus
 	}
 
 	// Refund the payment in MP
@@ -9,6 +9,7 @@ import (
 	"log"
 	"math"
 	"net/http"
+	"strconv"
 	"time"
 
 	"github.com/google/uuid"
@@ -46,10 +47,20 @@ func NewPaymentService(cfg config.Config, pr payment.PaymentRepository, scr paym
 		paymentRepo:    pr,
 		sellerCredRepo: scr,
 		orderRepo:      or,
-		httpClient:     &http.Client{Timeout: 10 * time.Second},
+		httpClient:     &http.Client{Timeout: 10 * time.Second, Transport: newMPTransport()},
 	}
 }
 
+// newMPTransport parte del transport por defecto pero conserva más
+// conexiones keep-alive hacia api.mercadopago.com: con el límite por defecto
+// (2 por host) cada pico de pedidos vuelve a pagar TCP + TLS.
+func newMPTransport() *http.Transport {
+	t := http.DefaultTransport.(*http.Transport).Clone()
+	t.MaxIdleConns = 64
+	t.MaxIdleConnsPerHost = 32
+	return t
+}
+
 func (s *paymentService) GetAuthorizationURL(sellerID string) string {
 	return fmt.Sprintf("https://auth.mercadopago.com.mx/authorization?client_id=%s&response_type=code&platform_id=mp&state=id=%s&redirect_uri=%s", s.cfg.MPClientID, sellerID, s.cfg.MPRedirectURI)
 }
@@ -301,23 +312,12 @@ func (s *paymentService) HandleWebhook(ctx context.Context, body []byte) error {
 		if err := json.NewDecoder(resp.Body).Decode(&paymentResp); err == nil {
 			// Find our local payment
 			if paymentResp.ExternalReference != "" {
-				p, err := s.paymentRepo.FindByOrderID(ctx, paymentResp.ExternalReference)
-				if err == nil && p != nil {
-					p.MPPaymentID = fmt.Sprintf("%d", paymentResp.ID)
-					
-					if paymentResp.Status == "approved" {
-						o, err := s.orderRepo.FindByID(ctx, p.OrderID)
-						if err == nil && o.Status == order.StatusPending {
-							if o.Type == order.TypeReserved {
-								o.Status = order.StatusReserved
-							} else {
-								o.Status = order.StatusPaid
-							}
-							_ = s.orderRepo.Update(ctx, o)
-						}
-					}
-
-					_ = s.paymentRepo.Update(ctx, p)
+				// Se vincula el pago por order_id sin leerlo antes; si la orden
+				// tiene pago local y fue aprobado, se confirma la orden.
+				orderID := paymentResp.ExternalReference
+				found, err := s.paymentRepo.LinkMPPayment(ctx, orderID, strconv.FormatInt(paymentResp.ID, 10))
+				if err == nil && found && paymentResp.Status == "approved" {
+					_, _ = s.orderRepo.ConfirmPayment(ctx, orderID)
 				}
 			}
 		}
@@ -2,6 +2,7 @@ package services
 
 import (
 	"context"
+	"errors"
 	"fmt"
 
 	"github.com/google/uuid"
@@ -40,7 +41,7 @@ type ProductService interface {
 	UpdateStock(ctx context.Context, id, ownerID string, stock int) (*product.Product, error)
 	Delete(ctx context.Context, id, ownerID string) error
 	GetByID(ctx context.Context, id string) (*product.Product, error)
-	GetByBusiness(ctx context.Context, businessID string) ([]*product.Product, error)
+	GetByBusiness(ctx context.Context, businessID string, page product.Page) ([]*product.Product, error)
 }
 
 // ----- Implementación -----
@@ -70,72 +71,49 @@ func (s *productService) Create(ctx context.Context, in CreateProductInput) (*pr
 	return p, nil
 }
 
+// Update, UpdateStock y Delete delegan la verificación de dueño al
+// repositorio, que la hace dentro de la misma sentencia de escritura.
 func (s *productService) Update(ctx context.Context, in UpdateProductInput) (*product.Product, error) {
-	p, err := s.productRepo.FindByID(ctx, in.ID)
-	if err != nil {
-		return nil, err
-	}
-
-	b, err := s.businessRepo.FindByID(ctx, p.BusinessID)
-	if err != nil {
-		return nil, err
-	}
-	if !b.OwnedBy(in.OwnerID) {
-		return nil, product.ErrUnauthorized
+	p := &product.Product{
+		ID:          in.ID,
+		Name:        in.Name,
+		Description: in.Description,
+		Price:       in.Price,
+		Stock:       in.Stock,
+		ImageURL:    in.ImageURL,
 	}
-
-	p.Name = in.Name
-	p.Description = in.Description
-	p.Price = in.Price
-	p.Stock = in.Stock
-	p.ImageURL = in.ImageURL
-
-	if err := s.productRepo.Update(ctx, p); err != nil {
+	if err := s.productRepo.UpdateOwned(ctx, p, in.OwnerID); err != nil {
+		if isProductLookupErr(err) {
+			return nil, err
+		}
 		return nil, fmt.Errorf("productService.Update: %w", err)
 	}
 	return p, nil
 }
 
 func (s *productService) UpdateStock(ctx context.Context, id, ownerID string, stock int) (*product.Product, error) {
-	p, err := s.productRepo.FindByID(ctx, id)
+	p, err := s.productRepo.UpdateStockOwned(ctx, id, ownerID, stock)
 	if err != nil {
-		return nil, err
-	}
-
-	b, err := s.businessRepo.FindByID(ctx, p.BusinessID)
-	if err != nil {
-		return nil, err
-	}
-	if !b.OwnedBy(ownerID) {
-		return nil, product.ErrUnauthorized
-	}
-
-	p.Stock = stock
-	if err := s.productRepo.Update(ctx, p); err != nil {
+		if isProductLookupErr(err) {
+			return nil, err
+		}
 		return nil, fmt.Errorf("productService.UpdateStock: %w", err)
 	}
 	return p, nil
 }
 
 func (s *productService) Delete(ctx context.Context, id, ownerID string) error {
-	p, err := s.productRepo.FindByID(ctx, id)
-	if err != nil {
-		return err
-	}
-	b, err := s.businessRepo.FindByID(ctx, p.BusinessID)
-	if err != nil {
-		return err
-	}
-	if !b.OwnedBy(ownerID) {
-		return product.ErrUnauthorized
-	}
-	return s.productRepo.Delete(ctx, id)
+	return s.productRepo.DeleteOwned(ctx, id, ownerID)
+}
+
+func isProductLookupErr(err error) bool {
+	return errors.Is(err, product.ErrNotFound) || errors.Is(err, product.ErrUnauthorized)
 }
 
 func (s *productService) GetByID(ctx context.Context, id string) (*product.Product, error) {
 	return s.productRepo.FindByID(ctx, id)
 }
 
-func (s *productService) GetByBusiness(ctx context.Context, businessID string) ([]*product.Product, error) {
-	return s.productRepo.FindByBusiness(ctx, businessID)
+func (s *productService) GetByBusiness(ctx context.Context, businessID string, page product.Page) ([]*product.Product, error) {
+	return s.productRepo.FindByBusiness(ctx, businessID, page)
 }
@@ -2,13 +2,14 @@ package services
 
 import (
 	"context"
+	"errors"
 	"fmt"
 
 	"github.com/google/uuid"
-	"golang.org/x/crypto/bcrypt"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/user"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/jwt"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/password"
 )
 
 // ----- DTOs de entrada -----
@@ -38,32 +39,30 @@ type UserService interface {
 type userService struct {
 	repo   user.Repository
 	jwtSvc *jwt.Service
+	pwdSvc *password.Service
 }
 
-func NewUserService(repo user.Repository, jwtSvc *jwt.Service) UserService {
-	return &userService{repo: repo, jwtSvc: jwtSvc}
+func NewUserService(repo user.Repository, jwtSvc *jwt.Service, pwdSvc *password.Service) UserService {
+	return &userService{repo: repo, jwtSvc: jwtSvc, pwdSvc: pwdSvc}
 }
 
 func (s *userService) Register(ctx context.Context, in RegisterInput) (*user.User, string, error) {
-	exists, err := s.repo.ExistsByEmail(ctx, in.Email)
-	if err != nil {
-		return nil, "", fmt.Errorf("userService.Register: %w", err)
-	}
-	if exists {
-		return nil, "", user.ErrEmailTaken
-	}
-
-	hash, err := bcrypt.GenerateFromPassword([]byte(in.Password), bcrypt.DefaultCost)
+	hash, err := s.pwdSvc.Hash(ctx, in.Password)
 	if err != nil {
 		return nil, "", fmt.Errorf("userService.Register hash: %w", err)
 	}
 
-	u, err := user.New(uuid.NewString(), in.Name, in.Email, string(hash), user.Role(in.Role))
+	u, err := user.New(uuid.NewString(), in.Name, in.Email, hash, user.Role(in.Role))
 	if err != nil {
 		return nil, "", err
 	}
 
+	// El chequeo de email duplicado va en el mismo INSERT (ON CONFLICT):
+	// una sola ida a la BD y sin carrera entre comprobar e insertar.
 	if err := s.repo.Save(ctx, u); err != nil {
+		if errors.Is(err, user.ErrEmailTaken) {
+			return nil, "", err
+		}
 		return nil, "", fmt.Errorf("userService.Register save: %w", err)
 	}
 
@@ -81,7 +80,7 @@ func (s *userService) Login(ctx context.Context, in LoginInput) (*user.User, str
 		return nil, "", user.ErrInvalidCreds
 	}
 
-	if err := bcrypt.CompareHashAndPassword([]byte(u.Password), []byte(in.Password)); err != nil {
+	if err := s.pwdSvc.Compare(ctx, u.Password, in.Password); err != nil {
 		return nil, "", user.ErrInvalidCreds
 	}
 
@@ -4,12 +4,17 @@ import "context"
 
 type Repository interface {
 	Save(ctx context.Context, b *Business) error
-	Update(ctx context.Context, b *Business) error
-	Delete(ctx context.Context, id string) error
+	// DeleteOwned da de baja el negocio sólo si pertenece a ownerID,
+	// comprobándolo en la misma sentencia. Devuelve ErrNotFound si no existe
+	// y ErrUnauthorized si es de otro dueño.
+	DeleteOwned(ctx context.Context, id, ownerID string) error
 	FindByID(ctx context.Context, id string) (*Business, error)
 	FindByOwner(ctx context.Context, ownerID string) ([]*Business, error)
-	// FindNearby devuelve negocios dentro de radiusKm kilómetros.
-	FindNearby(ctx context.Context, lat, lng, radiusKm float64) ([]*Business, error)
+	// FindNearby devuelve negocios dentro de radiusKm kilómetros, del más
+	// cercano al más lejano; limit 0 = sin límite.
+	FindNearby(ctx context.Context, lat, lng, radiusKm float64, limit int) ([]*Business, error)
 	SaveDeliveryPoint(ctx context.Context, dp *DeliveryPoint) error
+	// SaveDeliveryPoints inserta varios puntos en una sola sentencia.
+	SaveDeliveryPoints(ctx context.Context, dps []*DeliveryPoint) error
 	FindDeliveryPoints(ctx context.Context, businessID string) ([]*DeliveryPoint, error)
 }
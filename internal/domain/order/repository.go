@@ -1,16 +1,53 @@
 package order
 
-import "context"
+import (
+	"context"
+	"time"
+)
+
+// Page pide una página de órdenes ordenadas por (created_at, id) DESC usando
+// paginación por cursor: Before y BeforeID son el created_at y el ID de la
+// última orden de la página anterior (nil = empezar por la más reciente) y
+// Limit el tamaño de página (0 = sin límite). El ID desempata las órdenes
+// creadas en el mismo instante para que no se salten entre páginas. A
+// diferencia de OFFSET, Postgres no tiene que recorrer y descartar las filas
+// de las páginas previas.
+type Page struct {
+	Before   *time.Time
+	BeforeID string
+	Limit    int
+}
 
 type Repository interface {
-	Save(ctx context.Context, o *Order) error
-	Update(ctx context.Context, o *Order) error
+	// Place registra una orden nueva con sus items y descuenta el stock de
+	// los productos en una sola transacción. Si algún producto no tiene
+	// stock suficiente no se guarda nada y devuelve product.ErrNoStock.
+	Place(ctx context.Context, o *Order) error
+	// Update guarda el nuevo estado de la orden solo si en la BD sigue en el
+	// estado from; si otra operación la cambió antes (p. ej. una cancelación)
+	// devuelve ErrInvalidStatus.
+	Update(ctx context.Context, o *Order, from Status) error
 	FindByID(ctx context.Context, id string) (*Order, error)
-	FindByBuyer(ctx context.Context, buyerID string) ([]*Order, error)
-	FindByBusiness(ctx context.Context, businessID string) ([]*Order, error)
-	FindByQRCode(ctx context.Context, qrCode string) (*Order, error)
-	// CancelExpired cancela pedidos tipo 'reserved' que pasaron su deadline.
+	// FindByBuyer y FindByBusiness devuelven cada orden con sus items.
+	FindByBuyer(ctx context.Context, buyerID string, page Page) ([]*Order, error)
+	FindByBusiness(ctx context.Context, businessID string, page Page) ([]*Order, error)
+	// FindByQRCode devuelve además si la orden ya pasó su pickup_deadline
+	// según el reloj de la BD, el mismo que usa ClaimDelivery.
+	FindByQRCode(ctx context.Context, qrCode string) (*Order, bool, error)
+	// ClaimDelivery marca como entregada la orden 'ready' y no vencida con
+	// ese QR si pertenece a un negocio de ownerID. Devuelve ErrNotFound si
+	// ninguna orden cumple las condiciones.
+	ClaimDelivery(ctx context.Context, qrCode, ownerID string) (*Order, error)
+	// ConfirmPayment pasa una orden pendiente a 'paid' (online) o 'reserved'
+	// (apartado) cuando se aprueba su pago. Devuelve false si la orden no
+	// existe o ya no estaba pendiente.
+	ConfirmPayment(ctx context.Context, id string) (bool, error)
+	// Cancel cancela la orden si aún no estaba entregada ni cancelada y
+	// devuelve al inventario su stock en la misma transacción. Devuelve false
+	// si la orden no existe o ya no se podía cancelar.
+	Cancel(ctx context.Context, id string) (bool, error)
+	// CancelExpired cancela pedidos tipo 'reserved' que pasaron su deadline
+	// y devuelve al inventario el stock que tenían apartado.
 	// Retorna los IDs de las órdenes canceladas para procesar reembolsos.
 	CancelExpired(ctx context.Context) ([]string, error)
-	SaveItems(ctx context.Context, items []Item) error
 }
@@ -7,6 +7,9 @@ type PaymentRepository interface {
 	Update(ctx context.Context, p *Payment) error
 	FindByOrderID(ctx context.Context, orderID string) (*Payment, error)
 	FindByMPPaymentID(ctx context.Context, mpPaymentID string) (*Payment, error)
+	// LinkMPPayment guarda el ID de pago de Mercado Pago en el pago de la
+	// orden. Devuelve false si la orden no tiene pago local.
+	LinkMPPayment(ctx context.Context, orderID, mpPaymentID string) (bool, error)
 }
 
 type SellerCredentialRepository interface {
@@ -9,6 +9,8 @@ var (
 	ErrNotFound     = errors.New("product: not found")
 	ErrNoStock      = errors.New("product: insufficient stock")
 	ErrUnauthorized = errors.New("product: not owner")
+	// ErrInvalidCursor: el cursor de paginación no es un producto del negocio.
+	ErrInvalidCursor = errors.New("product: invalid cursor")
 )
 
 type Product struct {
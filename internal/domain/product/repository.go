@@ -2,12 +2,29 @@ package product
 
 import "context"
 
+// Page pide una página del catálogo de un negocio, ordenado por nombre, con
+// paginación por cursor: After es el ID del último producto de la página
+// anterior ("" = desde el principio) y Limit el tamaño de página
+// (0 = sin límite); si After no es un producto del negocio devuelve
+// ErrInvalidCursor. Postgres salta directo a la posición del cursor en vez
+// de recorrer y descartar las filas previas como con OFFSET.
+type Page struct {
+	After string
+	Limit int
+}
+
 type Repository interface {
 	Save(ctx context.Context, p *Product) error
-	Update(ctx context.Context, p *Product) error
-	Delete(ctx context.Context, id string) error
 	FindByID(ctx context.Context, id string) (*Product, error)
-	FindByBusiness(ctx context.Context, businessID string) ([]*Product, error)
-	// DecreaseStock disminuye el stock de forma atómica (usado en creación de órdenes).
-	DecreaseStock(ctx context.Context, productID string, qty int) error
+	// FindByIDs trae varios productos activos en una sola consulta.
+	// Los IDs inexistentes o inactivos simplemente no aparecen en el resultado.
+	FindByIDs(ctx context.Context, ids []string) ([]*Product, error)
+	FindByBusiness(ctx context.Context, businessID string, page Page) ([]*Product, error)
+	// UpdateOwned, UpdateStockOwned y DeleteOwned aplican el cambio sólo si el
+	// producto pertenece a un negocio activo de ownerID, comprobándolo en la
+	// misma sentencia. Devuelven ErrNotFound si el producto no existe y
+	// ErrUnauthorized si es de otro dueño.
+	UpdateOwned(ctx context.Context, p *Product, ownerID string) error
+	UpdateStockOwned(ctx context.Context, id, ownerID string, stock int) (*Product, error)
+	DeleteOwned(ctx context.Context, id, ownerID string) error
 }
@@ -52,14 +52,19 @@ func (h *BusinessHandler) Create(w http.ResponseWriter, r *http.Request) {
 	response.JSON(w, http.StatusCreated, b)
 }
 
-// GET /api/v1/businesses?lat=&lng=&radius=
+// GET /api/v1/businesses?lat=&lng=&radius=&limit=
 func (h *BusinessHandler) ListNearby(w http.ResponseWriter, r *http.Request) {
 	lat, _ := strconv.ParseFloat(r.URL.Query().Get("lat"), 64)
 	lng, _ := strconv.ParseFloat(r.URL.Query().Get("lng"), 64)
 	radius, _ := strconv.ParseFloat(r.URL.Query().Get("radius"), 64)
+	limit, err := parseLimit(r)
+	if err != nil {
+		response.Error(w, http.StatusBadRequest, err.Error())
+		return
+	}
 
 	list, err := h.svc.GetNearby(r.Context(), services.NearbyInput{
-		Lat: lat, Lng: lng, RadiusKm: radius,
+		Lat: lat, Lng: lng, RadiusKm: radius, Limit: limit,
 	})
 	if err != nil {
 		response.Error(w, http.StatusInternalServerError, err.Error())
@@ -91,7 +96,7 @@ func (h *BusinessHandler) Get(w http.ResponseWriter, r *http.Request) {
 		response.Error(w, http.StatusInternalServerError, err.Error())
 		return
 	}
-	response.JSON(w, http.StatusOK, b)
+	response.JSONWithETag(w, r, http.StatusOK, b)
 }
 
 // POST /api/v1/businesses/:id/delivery-points
@@ -126,6 +131,49 @@ func (h *BusinessHandler) AddDeliveryPoint(w http.ResponseWriter, r *http.Reques
 	response.JSON(w, http.StatusCreated, dp)
 }
 
+// maxDeliveryPointBatch acota cuántos puntos se aceptan en una petición.
+const maxDeliveryPointBatch = 100
+
+// POST /api/v1/businesses/:id/delivery-points/batch
+func (h *BusinessHandler) AddDeliveryPoints(w http.ResponseWriter, r *http.Request) {
+	var body []struct {
+		Name      string  `json:"name"`
+		Latitude  float64 `json:"latitude"`
+		Longitude float64 `json:"longitude"`
+	}
+	if err := json.NewDecoder(r.Body).Decode(&body); err != nil {
+		response.Error(w, http.StatusBadRequest, "invalid body")
+		return
+	}
+	if len(body) == 0 || len(body) > maxDeliveryPointBatch {
+		response.Error(w, http.StatusBadRequest, "expected between 1 and 100 delivery points")
+		return
+	}
+	points := make([]services.DeliveryPointData, len(body))
+	for i, p := range body {
+		points[i] = services.DeliveryPointData{Name: p.Name, Latitude: p.Latitude, Longitude: p.Longitude}
+	}
+
+	dps, err := h.svc.AddDeliveryPoints(r.Context(), services.CreateDeliveryPointsInput{
+		BusinessID: chi.URLParam(r, "id"),
+		OwnerID:    middleware.UserIDFromCtx(r.Context()),
+		Points:     points,
+	})
+	if errors.Is(err, business.ErrNotFound) {
+		response.Error(w, http.StatusNotFound, "business not found")
+		return
+	}
+	if errors.Is(err, business.ErrUnauthorized) {
+		response.Error(w, http.StatusForbidden, err.Error())
+		return
+	}
+	if err != nil {
+		response.Error(w, http.StatusInternalServerError, err.Error())
+		return
+	}
+	response.JSON(w, http.StatusCreated, dps)
+}
+
 // DELETE /api/v1/businesses/:id
 func (h *BusinessHandler) Delete(w http.ResponseWriter, r *http.Request) {
 	id := chi.URLParam(r, "id")
@@ -78,10 +78,15 @@ func (h *OrderHandler) Get(w http.ResponseWriter, r *http.Request) {
 	response.JSON(w, http.StatusOK, o)
 }
 
-// GET /api/v1/orders/my
+// GET /api/v1/orders/my?before=&before_id=&limit=
 func (h *OrderHandler) ListMine(w http.ResponseWriter, r *http.Request) {
+	page, err := parsePage(r)
+	if err != nil {
+		response.Error(w, http.StatusBadRequest, err.Error())
+		return
+	}
 	buyerID := middleware.UserIDFromCtx(r.Context())
-	list, err := h.svc.GetByBuyer(r.Context(), buyerID)
+	list, err := h.svc.GetByBuyer(r.Context(), buyerID, page)
 	if err != nil {
 		response.Error(w, http.StatusInternalServerError, err.Error())
 		return
@@ -89,11 +94,16 @@ func (h *OrderHandler) ListMine(w http.ResponseWriter, r *http.Request) {
 	response.JSON(w, http.StatusOK, list)
 }
 
-// GET /api/v1/businesses/:businessId/orders
+// GET /api/v1/businesses/:businessId/orders?before=&before_id=&limit=
 func (h *OrderHandler) ListByBusiness(w http.ResponseWriter, r *http.Request) {
+	page, err := parsePage(r)
+	if err != nil {
+		response.Error(w, http.StatusBadRequest, err.Error())
+		return
+	}
 	sellerID := middleware.UserIDFromCtx(r.Context())
 	businessID := chi.URLParam(r, "businessId")
-	list, err := h.svc.GetByBusiness(r.Context(), businessID, sellerID)
+	list, err := h.svc.GetByBusiness(r.Context(), businessID, sellerID, page)
 	if errors.Is(err, order.ErrUnauthorized) {
 		response.Error(w, http.StatusForbidden, err.Error())
 		return
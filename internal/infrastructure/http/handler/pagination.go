@@ -0,0 +1,53 @@
+package handler
+
+import (
+	"errors"
+	"net/http"
+	"strconv"
+	"time"
+
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/order"
+)
+
+// maxPageLimit acota el tamaño de página que puede pedir un cliente.
+const maxPageLimit = 100
+
+// parsePage lee ?before=<RFC3339>&before_id=<id>&limit=<n> para la
+// paginación por cursor; before y before_id van siempre juntos. Sin
+// parámetros devuelve la lista completa, como antes.
+func parsePage(r *http.Request) (order.Page, error) {
+	var page order.Page
+	q := r.URL.Query()
+	before, beforeID := q.Get("before"), q.Get("before_id")
+	if (before == "") != (beforeID == "") {
+		return page, errors.New("before and before_id must be sent together")
+	}
+	if before != "" {
+		t, err := time.Parse(time.RFC3339Nano, before)
+		if err != nil {
+			return page, errors.New("invalid before: expected RFC3339 timestamp")
+		}
+		page.Before = &t
+		page.BeforeID = beforeID
+	}
+	limit, err := parseLimit(r)
+	if err != nil {
+		return page, err
+	}
+	page.Limit = limit
+	return page, nil
+}
+
+// parseLimit lee ?limit=<n> acotado a maxPageLimit; sin el parámetro
+// devuelve 0, que los repositorios interpretan como "sin límite".
+func parseLimit(r *http.Request) (int, error) {
+	v := r.URL.Query().Get("limit")
+	if v == "" {
+		return 0, nil
+	}
+	n, err := strconv.Atoi(v)
+	if err != nil || n < 0 {
+		return 0, errors.New("invalid limit")
+	}
+	return min(n, maxPageLimit), nil
+}
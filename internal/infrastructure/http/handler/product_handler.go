@@ -60,7 +60,17 @@ func (h *ProductHandler) Create(w http.ResponseWriter, r *http.Request) {
 // GET /api/v1/businesses/:businessId/products
 func (h *ProductHandler) ListByBusiness(w http.ResponseWriter, r *http.Request) {
 	businessID := chi.URLParam(r, "businessId")
-	list, err := h.svc.GetByBusiness(r.Context(), businessID)
+	limit, err := parseLimit(r)
+	if err != nil {
+		response.Error(w, http.StatusBadRequest, err.Error())
+		return
+	}
+	page := product.Page{After: r.URL.Query().Get("after"), Limit: limit}
+	list, err := h.svc.GetByBusiness(r.Context(), businessID, page)
+	if errors.Is(err, product.ErrInvalidCursor) {
+		response.Error(w, http.StatusBadRequest, "invalid after: unknown product")
+		return
+	}
 	if err != nil {
 		response.Error(w, http.StatusInternalServerError, err.Error())
 		return
@@ -105,6 +115,10 @@ func (h *ProductHandler) Update(w http.ResponseWriter, r *http.Request) {
 		Stock:       body.Stock,
 		ImageURL:    body.ImageURL,
 	})
+	if errors.Is(err, product.ErrNotFound) {
+		response.Error(w, http.StatusNotFound, "product not found")
+		return
+	}
 	if errors.Is(err, product.ErrUnauthorized) {
 		response.Error(w, http.StatusForbidden, err.Error())
 		return
@@ -120,6 +134,10 @@ func (h *ProductHandler) Update(w http.ResponseWriter, r *http.Request) {
 func (h *ProductHandler) Delete(w http.ResponseWriter, r *http.Request) {
 	ownerID := middleware.UserIDFromCtx(r.Context())
 	err := h.svc.Delete(r.Context(), chi.URLParam(r, "id"), ownerID)
+	if errors.Is(err, product.ErrNotFound) {
+		response.Error(w, http.StatusNotFound, "product not found")
+		return
+	}
 	if errors.Is(err, product.ErrUnauthorized) {
 		response.Error(w, http.StatusForbidden, err.Error())
 		return
@@ -20,6 +20,14 @@ func NewUserHandler(svc services.UserService, notifSvc services.NotificationServ
 	return &UserHandler{svc: svc, notifSvc: notifSvc}
 }
 
+// authResponse es el cuerpo de registro y login. Un struct en lugar de
+// map[string]any deja que encoding/json use su encoder cacheado por tipo
+// en vez de reflejar y ordenar las claves del mapa en cada respuesta.
+type authResponse struct {
+	User  *user.User `json:"user"`
+	Token string     `json:"token"`
+}
+
 // POST /api/v1/auth/register
 func (h *UserHandler) Register(w http.ResponseWriter, r *http.Request) {
 	var body struct {
@@ -51,10 +59,7 @@ func (h *UserHandler) Register(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	response.JSON(w, http.StatusCreated, map[string]any{
-		"user":  u,
-		"token": token,
-	})
+	response.JSON(w, http.StatusCreated, authResponse{User: u, Token: token})
 }
 
 // POST /api/v1/auth/login
@@ -77,10 +82,7 @@ func (h *UserHandler) Login(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	response.JSON(w, http.StatusOK, map[string]any{
-		"user":  u,
-		"token": token,
-	})
+	response.JSON(w, http.StatusOK, authResponse{User: u, Token: token})
 }
 
 // GET /api/v1/users/me
@@ -11,10 +11,9 @@ import (
 
 type contextKey string
 
-const (
-	CtxUserID contextKey = "userID"
-	CtxRole   contextKey = "role"
-)
+// CtxClaims guarda los claims ya verificados del token: un solo valor en el
+// contexto del que salen userID y role, en lugar de una capa por campo.
+const CtxClaims contextKey = "claims"
 
 // Auth valida el Bearer token y pone userID + role en el contexto.
 func Auth(jwtSvc *jwt.Service) func(http.Handler) http.Handler {
@@ -30,8 +29,7 @@ func Auth(jwtSvc *jwt.Service) func(http.Handler) http.Handler {
 				response.Error(w, http.StatusUnauthorized, "invalid token")
 				return
 			}
-			ctx := context.WithValue(r.Context(), CtxUserID, claims.UserID)
-			ctx = context.WithValue(ctx, CtxRole, claims.Role)
+			ctx := context.WithValue(r.Context(), CtxClaims, claims)
 			next.ServeHTTP(w, r.WithContext(ctx))
 		})
 	}
@@ -41,7 +39,7 @@ func Auth(jwtSvc *jwt.Service) func(http.Handler) http.Handler {
 func RequireRole(role string) func(http.Handler) http.Handler {
 	return func(next http.Handler) http.Handler {
 		return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
-			if r.Context().Value(CtxRole) != role {
+			if RoleFromCtx(r.Context()) != role {
 				response.Error(w, http.StatusForbidden, "insufficient permissions")
 				return
 			}
@@ -51,6 +49,15 @@ func RequireRole(role string) func(http.Handler) http.Handler {
 }
 
 func UserIDFromCtx(ctx context.Context) string {
-	v, _ := ctx.Value(CtxUserID).(string)
-	return v
+	if c, ok := ctx.Value(CtxClaims).(*jwt.Claims); ok {
+		return c.UserID
+	}
+	return ""
+}
+
+func RoleFromCtx(ctx context.Context) string {
+	if c, ok := ctx.Value(CtxClaims).(*jwt.Claims); ok {
+		return c.Role
+	}
+	return ""
 }
@@ -60,6 +60,7 @@ func NewRouter(h Handlers, jwtSvc *jwt.Service) http.Handler {
 				r.Delete("/businesses/{id}", h.Business.Delete)
 				r.Get("/businesses/mine", h.Business.ListMine)
 				r.Post("/businesses/{id}/delivery-points", h.Business.AddDeliveryPoint)
+				r.Post("/businesses/{id}/delivery-points/batch", h.Business.AddDeliveryPoints)
 
 				// Productos: crear/editar/borrar
 				r.Post("/businesses/{businessId}/products", h.Product.Create)
@@ -0,0 +1,103 @@
+package cache
+
+import (
+	"context"
+	"time"
+
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/business"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/ttlmap"
+)
+
+// maxEntries acota la memoria de cada caché (ver ttlmap.Map).
+const maxEntries = 10000
+
+// businessRepository envuelve un business.Repository y recuerda FindByID
+// y FindDeliveryPoints durante ttl. Casi todas las rutas de órdenes y
+// productos cargan el negocio sólo para validar al dueño, el detalle del
+// negocio trae además sus puntos de entrega, y ambos cambian muy rara vez.
+// DeleteOwned y SaveDeliveryPoint(s) invalidan las entradas en esta
+// instancia; en otras instancias el cambio se ve, a lo sumo, tras ttl.
+type businessRepository struct {
+	business.Repository
+	ttl time.Duration
+
+	businesses *ttlmap.Map[string, business.Business]
+	points     *ttlmap.Map[string, []business.DeliveryPoint]
+}
+
+// NewBusinessRepository devuelve inner tal cual si ttl <= 0.
+func NewBusinessRepository(inner business.Repository, ttl time.Duration) business.Repository {
+	if ttl <= 0 {
+		return inner
+	}
+	return &businessRepository{
+		Repository: inner,
+		ttl:        ttl,
+		businesses: ttlmap.New[string, business.Business](maxEntries),
+		points:     ttlmap.New[string, []business.DeliveryPoint](maxEntries),
+	}
+}
+
+func (r *businessRepository) FindByID(ctx context.Context, id string) (*business.Business, error) {
+	if b, ok := r.businesses.Get(id); ok {
+		return &b, nil // copia: los servicios modifican el negocio devuelto
+	}
+
+	b, err := r.Repository.FindByID(ctx, id)
+	if err != nil {
+		return nil, err
+	}
+	cached := *b
+	cached.DeliveryPoints = nil
+	r.businesses.Set(id, cached, time.Now().Add(r.ttl))
+	return b, nil
+}
+
+func (r *businessRepository) FindDeliveryPoints(ctx context.Context, businessID string) ([]*business.DeliveryPoint, error) {
+	if cached, ok := r.points.Get(businessID); ok {
+		return copyPoints(cached), nil
+	}
+
+	dps, err := r.Repository.FindDeliveryPoints(ctx, businessID)
+	if err != nil {
+		return nil, err
+	}
+	cached := make([]business.DeliveryPoint, len(dps))
+	for i, dp := range dps {
+		cached[i] = *dp
+	}
+	r.points.Set(businessID, cached, time.Now().Add(r.ttl))
+	return dps, nil
+}
+
+func (r *businessRepository) SaveDeliveryPoint(ctx context.Context, dp *business.DeliveryPoint) error {
+	err := r.Repository.SaveDeliveryPoint(ctx, dp)
+	r.points.Delete(dp.BusinessID)
+	return err
+}
+
+func (r *businessRepository) SaveDeliveryPoints(ctx context.Context, dps []*business.DeliveryPoint) error {
+	err := r.Repository.SaveDeliveryPoints(ctx, dps)
+	for _, dp := range dps {
+		r.points.Delete(dp.BusinessID)
+	}
+	return err
+}
+
+// copyPoints devuelve punteros a copias nuevas, para que quien llama no
+// pueda modificar lo que está en el caché.
+func copyPoints(cached []business.DeliveryPoint) []*business.DeliveryPoint {
+	out := make([]*business.DeliveryPoint, len(cached))
+	for i := range cached {
+		dp := cached[i]
+		out[i] = &dp
+	}
+	return out
+}
+
+func (r *businessRepository) DeleteOwned(ctx context.Context, id, ownerID string) error {
+	err := r.Repository.DeleteOwned(ctx, id, ownerID)
+	r.businesses.Delete(id)
+	r.points.Delete(id)
+	return err
+}
@@ -0,0 +1,43 @@
+package cache
+
+import (
+	"context"
+	"time"
+
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/user"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/ttlmap"
+)
+
+// userRepository envuelve un user.Repository y recuerda FindByID durante
+// ttl: GET /users/me lo llama en cada petición y la API no tiene forma de
+// editar un usuario.
+type userRepository struct {
+	user.Repository
+	ttl   time.Duration
+	users *ttlmap.Map[string, user.User]
+}
+
+// NewUserRepository devuelve inner tal cual si ttl <= 0.
+func NewUserRepository(inner user.Repository, ttl time.Duration) user.Repository {
+	if ttl <= 0 {
+		return inner
+	}
+	return &userRepository{
+		Repository: inner,
+		ttl:        ttl,
+		users:      ttlmap.New[string, user.User](maxEntries),
+	}
+}
+
+func (r *userRepository) FindByID(ctx context.Context, id string) (*user.User, error) {
+	if u, ok := r.users.Get(id); ok {
+		return &u, nil // copia: el llamador puede modificarla
+	}
+
+	u, err := r.Repository.FindByID(ctx, id)
+	if err != nil {
+		return nil, err
+	}
+	r.users.Set(id, *u, time.Now().Add(r.ttl))
+	return u, nil
+}
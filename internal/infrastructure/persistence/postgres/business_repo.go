@@ -5,8 +5,10 @@ import (
 	"database/sql"
 	"errors"
 	"fmt"
+	"time"
 
 	"github.com/jmoiron/sqlx"
+	"github.com/lib/pq"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/business"
 )
@@ -19,21 +21,19 @@ func NewBusinessRepository(db *sqlx.DB) business.Repository {
 	return &businessRepository{db: db}
 }
 
+// Save devuelve los timestamps con RETURNING en la misma sentencia, para
+// no responder con fechas en cero ni releer el negocio.
 func (r *businessRepository) Save(ctx context.Context, b *business.Business) error {
 	q := `INSERT INTO businesses (id, owner_id, name, description, type, location, active)
-	      VALUES ($1, $2, $3, $4, $5, ST_SetSRID(ST_MakePoint($6, $7), 4326)::geography, $8)`
-	_, err := r.db.ExecContext(ctx, q,
-		b.ID, b.OwnerID, b.Name, b.Description, b.Type, b.Longitude, b.Latitude, b.Active)
-	return err
-}
-
-func (r *businessRepository) Update(ctx context.Context, b *business.Business) error {
-	q := `UPDATE businesses SET name=$1, description=$2, type=$3,
-	      location=ST_SetSRID(ST_MakePoint($4, $5), 4326)::geography, active=$6
-	      WHERE id=$7`
-	_, err := r.db.ExecContext(ctx, q,
-		b.Name, b.Description, b.Type, b.Longitude, b.Latitude, b.Active, b.ID)
-	return err
+	      VALUES ($1, $2, $3, $4, $5, ST_SetSRID(ST_MakePoint($6, $7), 4326)::geography, $8)
+	      RETURNING created_at, updated_at`
+	err := r.db.QueryRowxContext(ctx, q,
+		b.ID, b.OwnerID, b.Name, b.Description, b.Type, b.Longitude, b.Latitude, b.Active).
+		Scan(&b.CreatedAt, &b.UpdatedAt)
+	if err != nil {
+		return fmt.Errorf("businessRepo.Save: %w", err)
+	}
+	return nil
 }
 
 func (r *businessRepository) FindByID(ctx context.Context, id string) (*business.Business, error) {
@@ -66,7 +66,10 @@ func (r *businessRepository) FindByOwner(ctx context.Context, ownerID string) ([
 
 // FindNearby usa PostGIS ST_DWithin para encontrar negocios cercanos.
 // radiusKm se convierte a metros porque geography trabaja en metros.
-func (r *businessRepository) FindNearby(ctx context.Context, lat, lng, radiusKm float64) ([]*business.Business, error) {
+// Se ordena con el operador KNN (<->), que recorre el índice GiST del más
+// cercano al más lejano: con limit > 0 Postgres se detiene tras esas filas
+// en lugar de calcular ST_Distance para todo el radio y ordenarlo.
+func (r *businessRepository) FindNearby(ctx context.Context, lat, lng, radiusKm float64, limit int) ([]*business.Business, error) {
 	q := `SELECT id, owner_id, name, description, type,
 	          ST_Y(location::geometry) AS latitude,
 	          ST_X(location::geometry) AS longitude,
@@ -75,19 +78,78 @@ func (r *businessRepository) FindNearby(ctx context.Context, lat, lng, radiusKm
 	      FROM businesses
 	      WHERE active = TRUE
 	        AND ST_DWithin(location, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography, $3)
-	      ORDER BY distance`
+	      ORDER BY location <-> ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography
+	      LIMIT $4`
 
 	var list []*business.Business
-	err := r.db.SelectContext(ctx, &list, q, lat, lng, radiusKm*1000)
+	err := r.db.SelectContext(ctx, &list, q, lat, lng, radiusKm*1000, limitArg(limit))
 	return list, err
 }
 
+// SaveDeliveryPoint recupera created_at con RETURNING en el mismo INSERT,
+// igual que Save, para no devolver el punto con el timestamp en cero.
 func (r *businessRepository) SaveDeliveryPoint(ctx context.Context, dp *business.DeliveryPoint) error {
 	q := `INSERT INTO delivery_points (id, business_id, name, location, active)
-	      VALUES ($1, $2, $3, ST_SetSRID(ST_MakePoint($4, $5), 4326)::geography, $6)`
-	_, err := r.db.ExecContext(ctx, q,
-		dp.ID, dp.BusinessID, dp.Name, dp.Longitude, dp.Latitude, dp.Active)
-	return err
+	      VALUES ($1, $2, $3, ST_SetSRID(ST_MakePoint($4, $5), 4326)::geography, $6)
+	      RETURNING created_at`
+	err := r.db.QueryRowxContext(ctx, q,
+		dp.ID, dp.BusinessID, dp.Name, dp.Longitude, dp.Latitude, dp.Active).
+		Scan(&dp.CreatedAt)
+	if err != nil {
+		return fmt.Errorf("businessRepo.SaveDeliveryPoint: %w", err)
+	}
+	return nil
+}
+
+// SaveDeliveryPoints manda los puntos como arreglos paralelos y los inserta
+// con un único INSERT ... SELECT FROM unnest(...): una ida a la BD y un
+// solo plan sin importar cuántos puntos sean.
+func (r *businessRepository) SaveDeliveryPoints(ctx context.Context, dps []*business.DeliveryPoint) error {
+	if len(dps) == 0 {
+		return nil
+	}
+	var (
+		ids, businessIDs, names []string
+		lats, lngs              []float64
+		actives                 []bool
+	)
+	byID := make(map[string]*business.DeliveryPoint, len(dps))
+	for _, dp := range dps {
+		ids = append(ids, dp.ID)
+		businessIDs = append(businessIDs, dp.BusinessID)
+		names = append(names, dp.Name)
+		lats = append(lats, dp.Latitude)
+		lngs = append(lngs, dp.Longitude)
+		actives = append(actives, dp.Active)
+		byID[dp.ID] = dp
+	}
+	rows, err := r.db.QueryContext(ctx, `
+		INSERT INTO delivery_points (id, business_id, name, location, active)
+		SELECT u.id, u.business_id, u.name,
+		       ST_SetSRID(ST_MakePoint(u.lng, u.lat), 4326)::geography, u.active
+		FROM unnest($1::text[], $2::text[], $3::text[], $4::float8[], $5::float8[], $6::bool[])
+		     AS u(id, business_id, name, lat, lng, active)
+		RETURNING id, created_at`,
+		pq.Array(ids), pq.Array(businessIDs), pq.Array(names),
+		pq.Array(lats), pq.Array(lngs), pq.Array(actives))
+	if err != nil {
+		return fmt.Errorf("businessRepo.SaveDeliveryPoints: %w", err)
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var id string
+		var createdAt time.Time
+		if err := rows.Scan(&id, &createdAt); err != nil {
+			return fmt.Errorf("businessRepo.SaveDeliveryPoints: %w", err)
+		}
+		if dp, ok := byID[id]; ok {
+			dp.CreatedAt = createdAt
+		}
+	}
+	if err := rows.Err(); err != nil {
+		return fmt.Errorf("businessRepo.SaveDeliveryPoints: %w", err)
+	}
+	return nil
 }
 
 func (r *businessRepository) FindDeliveryPoints(ctx context.Context, businessID string) ([]*business.DeliveryPoint, error) {
@@ -101,7 +163,28 @@ func (r *businessRepository) FindDeliveryPoints(ctx context.Context, businessID
 	return list, err
 }
 
-func (r *businessRepository) Delete(ctx context.Context, id string) error {
-	_, err := r.db.ExecContext(ctx, `DELETE FROM businesses WHERE id = $1`, id)
-	return err
+// DeleteOwned hace la baja lógica con el dueño en el WHERE: una sola ida a
+// la BD en el caso normal, y sin reescribir el resto de columnas con una
+// copia que pudo quedar vieja.
+func (r *businessRepository) DeleteOwned(ctx context.Context, id, ownerID string) error {
+	res, err := r.db.ExecContext(ctx, `
+		UPDATE businesses SET active = FALSE, updated_at = NOW()
+		WHERE id = $1 AND owner_id = $2 AND active = TRUE`, id, ownerID)
+	if err != nil {
+		return fmt.Errorf("businessRepo.DeleteOwned: %w", err)
+	}
+	if n, _ := res.RowsAffected(); n > 0 {
+		return nil
+	}
+	// Sin filas: distinguir negocio inexistente (404) de negocio ajeno (403).
+	var exists bool
+	err = r.db.GetContext(ctx, &exists,
+		`SELECT EXISTS(SELECT 1 FROM businesses WHERE id = $1 AND active = TRUE)`, id)
+	if err != nil {
+		return fmt.Errorf("businessRepo.DeleteOwned: %w", err)
+	}
+	if exists {
+		return business.ErrUnauthorized
+	}
+	return business.ErrNotFound
 }
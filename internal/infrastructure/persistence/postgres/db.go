@@ -0,0 +1,101 @@
+package postgres
+
+import (
+	"context"
+	"database/sql"
+	"fmt"
+	"sync"
+
+	"github.com/jmoiron/sqlx"
+)
+
+// WarmPool abre n conexiones a la vez y las devuelve al pool ocioso, para
+// que las primeras peticiones no paguen el handshake TCP + auth de Postgres.
+// Las conexiones se retienen todas antes de liberarlas; si se soltaran una a
+// una, database/sql reutilizaría siempre la misma.
+func WarmPool(ctx context.Context, db *sqlx.DB, n int) error {
+	if max := db.Stats().MaxOpenConnections; max > 0 && n > max {
+		n = max
+	}
+	type result struct {
+		conn *sql.Conn
+		err  error
+	}
+	results := make(chan result, n)
+	for i := 0; i < n; i++ {
+		go func() {
+			conn, err := db.Conn(ctx)
+			if err == nil {
+				err = conn.PingContext(ctx)
+			}
+			results <- result{conn: conn, err: err}
+		}()
+	}
+
+	var firstErr error
+	for i := 0; i < n; i++ {
+		res := <-results
+		if res.err != nil && firstErr == nil {
+			firstErr = res.err
+		}
+		defer func(c *sql.Conn) {
+			if c != nil {
+				_ = c.Close()
+			}
+		}(res.conn)
+	}
+	if firstErr != nil {
+		return fmt.Errorf("postgres.WarmPool: %w", firstErr)
+	}
+	return nil
+}
+
+// stmtCache prepara cada consulta la primera vez que se usa y reutiliza el
+// *sqlx.Stmt en adelante. Con lib/pq una consulta sin preparar con
+// parámetros cuesta un Parse + Describe en el servidor antes de ejecutarse;
+// un statement preparado se parsea y planifica una sola vez por conexión
+// (database/sql lo re-prepara solo en las conexiones nuevas del pool).
+type stmtCache struct {
+	db *sqlx.DB
+	mu sync.RWMutex
+	m  map[string]*sqlx.Stmt
+}
+
+func newStmtCache(db *sqlx.DB) *stmtCache {
+	return &stmtCache{db: db, m: make(map[string]*sqlx.Stmt)}
+}
+
+// prepare lee con RLock, así los statements ya preparados no esperan a
+// nadie. El Prepare (una ida a la BD) se hace fuera del lock: si dos
+// goroutines preparan la misma consulta a la vez, se queda el primero que
+// se guardó y el otro se cierra.
+func (c *stmtCache) prepare(ctx context.Context, query string) (*sqlx.Stmt, error) {
+	c.mu.RLock()
+	st, ok := c.m[query]
+	c.mu.RUnlock()
+	if ok {
+		return st, nil
+	}
+
+	st, err := c.db.PreparexContext(ctx, query)
+	if err != nil {
+		return nil, err
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if prev, ok := c.m[query]; ok {
+		_ = st.Close()
+		return prev, nil
+	}
+	c.m[query] = st
+	return st, nil
+}
+
+// limitArg traduce un límite 0 a NULL: en Postgres "LIMIT NULL" no limita.
+func limitArg(n int) any {
+	if n <= 0 {
+		return nil
+	}
+	return n
+}
@@ -5,114 +5,473 @@ import (
 	"database/sql"
 	"errors"
 	"fmt"
+	"sort"
 
 	"github.com/jmoiron/sqlx"
+	"github.com/lib/pq"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/order"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/product"
 )
 
 type orderRepository struct {
-	db *sqlx.DB
+	db    *sqlx.DB
+	stmts *stmtCache
 }
 
 func NewOrderRepository(db *sqlx.DB) order.Repository {
-	return &orderRepository{db: db}
+	return &orderRepository{db: db, stmts: newStmtCache(db)}
 }
 
-func (r *orderRepository) Save(ctx context.Context, o *order.Order) error {
-	q := `INSERT INTO orders
+// orderColumns son las columnas que se mapean a order.Order. Los listados
+// y las búsquedas piden solo estas en lugar de SELECT *, así una columna
+// nueva en la tabla no viaja por la red ni se escanea sin usarse.
+const orderColumns = `id, buyer_id, business_id, type, status, total, qr_code,
+		       delivery_point_id, pickup_deadline, created_at, updated_at`
+
+// Consultas de las rutas más usadas (detalle, escaneo de QR y cambios de
+// estado); se ejecutan como statements preparados. Las columnas van
+// explícitas: con SELECT * un ALTER TABLE invalidaría el plan cacheado.
+const (
+	qOrderUpdate = `UPDATE orders SET status=$1, qr_code=$2, updated_at=NOW()
+	      WHERE id=$3 AND status=$4
+	      RETURNING updated_at`
+
+	qOrderFindByID = `
+		SELECT o.id, o.buyer_id, o.business_id, o.type, o.status, o.total, o.qr_code,
+		       o.delivery_point_id, o.pickup_deadline, o.created_at, o.updated_at,
+		       oi.id, oi.product_id, oi.quantity, oi.unit_price
+		FROM orders o
+		LEFT JOIN order_items oi ON oi.order_id = o.id
+		WHERE o.id = $1`
+
+	qOrderConfirmPayment = `
+		UPDATE orders
+		SET status = CASE WHEN type = 'reserved' THEN 'reserved' ELSE 'paid' END,
+		    updated_at = NOW()
+		WHERE id = $1 AND status = 'pending'`
+
+	qOrderFindByQRCode = `
+		SELECT ` + orderColumns + `,
+		       COALESCE(pickup_deadline < NOW(), FALSE) AS expired
+		FROM orders WHERE qr_code = $1`
+
+	qOrderClaimDelivery = `
+		UPDATE orders o
+		SET status = 'delivered', updated_at = NOW()
+		FROM businesses b
+		WHERE o.qr_code = $1 AND o.status = 'ready'
+		  AND (o.pickup_deadline IS NULL OR o.pickup_deadline >= NOW())
+		  AND b.id = o.business_id AND b.owner_id = $2 AND b.active = TRUE
+		RETURNING o.id, o.buyer_id, o.business_id, o.type, o.status, o.total, o.qr_code,
+		          o.delivery_point_id, o.pickup_deadline, o.created_at, o.updated_at`
+
+	// Listados por comprador / negocio, más recientes primero. Como en el
+	// catálogo, primera página y páginas con cursor van en sentencias
+	// separadas para que el plan genérico arranque el rango del índice en
+	// el cursor. El id desempata las órdenes con el mismo created_at; va
+	// como bpchar, el tipo de orders.id.
+	qOrderFindByBuyer = `
+		SELECT ` + orderColumns + ` FROM orders
+		WHERE buyer_id = $1
+		ORDER BY created_at DESC, id DESC
+		LIMIT $2`
+
+	qOrderFindByBuyerBefore = `
+		SELECT ` + orderColumns + ` FROM orders
+		WHERE buyer_id = $1 AND (created_at, id) < ($2, $3::bpchar)
+		ORDER BY created_at DESC, id DESC
+		LIMIT $4`
+
+	qOrderFindByBusiness = `
+		SELECT ` + orderColumns + ` FROM orders
+		WHERE business_id = $1
+		ORDER BY created_at DESC, id DESC
+		LIMIT $2`
+
+	qOrderFindByBusinessBefore = `
+		SELECT ` + orderColumns + ` FROM orders
+		WHERE business_id = $1 AND (created_at, id) < ($2, $3::bpchar)
+		ORDER BY created_at DESC, id DESC
+		LIMIT $4`
+)
+
+// qInsertItems con un slice de items lo expande sqlx en un único INSERT
+// multi-fila.
+const qInsertItems = `INSERT INTO order_items (id, order_id, product_id, quantity, unit_price)
+	      VALUES (:id, :order_id, :product_id, :quantity, :unit_price)`
+
+// Place descuenta el stock, inserta la orden y sus items en una sola
+// transacción: tres sentencias sin importar cuántos items tenga la orden,
+// y si algo falla no queda stock descontado para una orden inexistente.
+func (r *orderRepository) Place(ctx context.Context, o *order.Order) error {
+	qty := make(map[string]int64, len(o.Items))
+	for _, it := range o.Items {
+		qty[it.ProductID] += int64(it.Quantity)
+	}
+	ids := make([]string, 0, len(qty))
+	for id := range qty {
+		ids = append(ids, id)
+	}
+	sort.Strings(ids)
+	amounts := make([]int64, len(ids))
+	for i, id := range ids {
+		amounts[i] = qty[id]
+	}
+
+	tx, err := r.db.BeginTxx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("orderRepo.Place: %w", err)
+	}
+	defer tx.Rollback()
+
+	if err := lockProducts(ctx, tx, ids); err != nil {
+		return fmt.Errorf("orderRepo.Place lock: %w", err)
+	}
+
+	// Un solo UPDATE para todos los productos; cada fila solo se toca si le
+	// alcanza el stock, así que menos filas afectadas = falta stock.
+	// Los IDs van como bpchar[], el tipo de products.id: con text[] Postgres
+	// compararía como text y no podría usar el índice de la PK.
+	res, err := tx.ExecContext(ctx, `
+		UPDATE products p
+		SET stock = p.stock - v.qty
+		FROM unnest($1::bpchar[], $2::int[]) AS v(id, qty)
+		WHERE p.id = v.id AND p.stock >= v.qty`, pq.Array(ids), pq.Array(amounts))
+	if err != nil {
+		return fmt.Errorf("orderRepo.Place stock: %w", err)
+	}
+	if n, _ := res.RowsAffected(); n != int64(len(ids)) {
+		return product.ErrNoStock
+	}
+
+	err = tx.QueryRowxContext(ctx, `INSERT INTO orders
 	      (id, buyer_id, business_id, type, status, total, qr_code, delivery_point_id, pickup_deadline)
-	      VALUES (:id, :buyer_id, :business_id, :type, :status, :total, :qr_code, :delivery_point_id, :pickup_deadline)`
-	_, err := r.db.NamedExecContext(ctx, q, o)
+	      VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+	      RETURNING created_at, updated_at`,
+		o.ID, o.BuyerID, o.BusinessID, o.Type, o.Status, o.Total, o.QRCode, o.DeliveryPointID, o.PickupDeadline).
+		Scan(&o.CreatedAt, &o.UpdatedAt)
 	if err != nil {
-		return fmt.Errorf("orderRepo.Save: %w", err)
+		return fmt.Errorf("orderRepo.Place order: %w", err)
 	}
-	return nil
-}
 
-func (r *orderRepository) SaveItems(ctx context.Context, items []order.Item) error {
-	q := `INSERT INTO order_items (id, order_id, product_id, quantity, unit_price)
-	      VALUES (:id, :order_id, :product_id, :quantity, :unit_price)`
-	_, err := r.db.NamedExecContext(ctx, q, items)
-	return err
+	for i := range o.Items {
+		o.Items[i].OrderID = o.ID
+	}
+	if len(o.Items) > 0 {
+		if _, err := tx.NamedExecContext(ctx, qInsertItems, o.Items); err != nil {
+			return fmt.Errorf("orderRepo.Place items: %w", err)
+		}
+	}
+
+	if err := tx.Commit(); err != nil {
+		return fmt.Errorf("orderRepo.Place: %w", err)
+	}
+	return nil
 }
 
-func (r *orderRepository) Update(ctx context.Context, o *order.Order) error {
-	q := `UPDATE orders SET status=:status, qr_code=:qr_code, updated_at=NOW() WHERE id=:id`
-	_, err := r.db.NamedExecContext(ctx, q, o)
-	return err
+// Update usa parámetros posicionales: es la escritura más frecuente (cada
+// cambio de estado) y así sqlx no recompila la consulta nombrada ni recorre
+// el struct por reflexión en cada llamada. Como las demás transiciones, el
+// UPDATE se condiciona al estado leído: si una cancelación o el job de
+// vencidas se adelantó, no se pisa el 'cancelled'.
+func (r *orderRepository) Update(ctx context.Context, o *order.Order, from order.Status) error {
+	st, err := r.stmts.prepare(ctx, qOrderUpdate)
+	if err != nil {
+		return fmt.Errorf("orderRepo.Update: %w", err)
+	}
+	err = st.QueryRowxContext(ctx, o.Status, o.QRCode, o.ID, from).Scan(&o.UpdatedAt)
+	if errors.Is(err, sql.ErrNoRows) {
+		return order.ErrInvalidStatus
+	}
+	if err != nil {
+		return fmt.Errorf("orderRepo.Update: %w", err)
+	}
+	return nil
 }
 
+// FindByID trae la orden y sus items en una sola consulta (LEFT JOIN) en
+// lugar de dos idas a la BD. Cada fila repite las columnas de la orden; se
+// toman de la primera y del resto solo se leen las del item.
 func (r *orderRepository) FindByID(ctx context.Context, id string) (*order.Order, error) {
-	var o order.Order
-	err := r.db.GetContext(ctx, &o, `SELECT * FROM orders WHERE id = $1`, id)
-	if errors.Is(err, sql.ErrNoRows) {
-		return nil, order.ErrNotFound
+	st, err := r.stmts.prepare(ctx, qOrderFindByID)
+	if err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByID: %w", err)
 	}
+	rows, err := st.QueryContext(ctx, id)
 	if err != nil {
 		return nil, fmt.Errorf("orderRepo.FindByID: %w", err)
 	}
+	defer rows.Close()
 
-	var items []order.Item
-	if err := r.db.SelectContext(ctx, &items, `SELECT * FROM order_items WHERE order_id = $1`, id); err != nil {
-		return nil, err
+	var (
+		o                 *order.Order
+		row               order.Order
+		itemID, productID sql.NullString
+		quantity          sql.NullInt64
+		unitPrice         sql.NullFloat64
+	)
+	for rows.Next() {
+		err := rows.Scan(
+			&row.ID, &row.BuyerID, &row.BusinessID, &row.Type, &row.Status, &row.Total, &row.QRCode,
+			&row.DeliveryPointID, &row.PickupDeadline, &row.CreatedAt, &row.UpdatedAt,
+			&itemID, &productID, &quantity, &unitPrice)
+		if err != nil {
+			return nil, fmt.Errorf("orderRepo.FindByID: %w", err)
+		}
+		if o == nil {
+			o = &row
+		}
+		if itemID.Valid {
+			o.Items = append(o.Items, order.Item{
+				ID:        itemID.String,
+				OrderID:   o.ID,
+				ProductID: productID.String,
+				Quantity:  int(quantity.Int64),
+				UnitPrice: unitPrice.Float64,
+			})
+		}
 	}
-	o.Items = items
-	return &o, nil
+	if err := rows.Err(); err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByID: %w", err)
+	}
+	if o == nil {
+		return nil, order.ErrNotFound
+	}
+	return o, nil
 }
 
-func (r *orderRepository) FindByBuyer(ctx context.Context, buyerID string) ([]*order.Order, error) {
-	var list []*order.Order
-	err := r.db.SelectContext(ctx, &list,
-		`SELECT * FROM orders WHERE buyer_id = $1 ORDER BY created_at DESC`, buyerID)
-	return list, err
+func (r *orderRepository) FindByBuyer(ctx context.Context, buyerID string, page order.Page) ([]*order.Order, error) {
+	list, err := r.list(ctx, qOrderFindByBuyer, qOrderFindByBuyerBefore, buyerID, page)
+	if err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByBuyer: %w", err)
+	}
+	if err := r.loadItems(ctx, list); err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByBuyer: %w", err)
+	}
+	return list, nil
+}
+
+func (r *orderRepository) FindByBusiness(ctx context.Context, businessID string, page order.Page) ([]*order.Order, error) {
+	list, err := r.list(ctx, qOrderFindByBusiness, qOrderFindByBusinessBefore, businessID, page)
+	if err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByBusiness: %w", err)
+	}
+	if err := r.loadItems(ctx, list); err != nil {
+		return nil, fmt.Errorf("orderRepo.FindByBusiness: %w", err)
+	}
+	return list, nil
 }
 
-func (r *orderRepository) FindByBusiness(ctx context.Context, businessID string) ([]*order.Order, error) {
+// list ejecuta la sentencia de primera página o la del cursor según page.
+func (r *orderRepository) list(ctx context.Context, first, before, ownerID string, page order.Page) ([]*order.Order, error) {
+	q, args := first, []any{ownerID, limitArg(page.Limit)}
+	if page.Before != nil {
+		q, args = before, []any{ownerID, page.Before, page.BeforeID, limitArg(page.Limit)}
+	}
+	st, err := r.stmts.prepare(ctx, q)
+	if err != nil {
+		return nil, err
+	}
 	var list []*order.Order
-	err := r.db.SelectContext(ctx, &list,
-		`SELECT * FROM orders WHERE business_id = $1 ORDER BY created_at DESC`, businessID)
-	return list, err
+	if err := st.SelectContext(ctx, &list, args...); err != nil {
+		return nil, err
+	}
+	return list, nil
+}
+
+// loadItems trae los items de todas las órdenes de la página en una sola
+// consulta (order_id = ANY) y los reparte por orden, en lugar de una
+// consulta por orden.
+func (r *orderRepository) loadItems(ctx context.Context, list []*order.Order) error {
+	if len(list) == 0 {
+		return nil
+	}
+	ids := make([]string, len(list))
+	byID := make(map[string]*order.Order, len(list))
+	for i, o := range list {
+		ids[i] = o.ID
+		byID[o.ID] = o
+	}
+
+	var items []order.Item
+	err := r.db.SelectContext(ctx, &items, `
+		SELECT id, order_id, product_id, quantity, unit_price
+		FROM order_items WHERE order_id = ANY($1)`, pq.Array(ids))
+	if err != nil {
+		return err
+	}
+	for _, it := range items {
+		if o, ok := byID[it.OrderID]; ok {
+			o.Items = append(o.Items, it)
+		}
+	}
+	return nil
+}
+
+// FindByQRCode calcula el vencimiento con NOW() de Postgres, como
+// ClaimDelivery: con time.Now() de la app, cerca del deadline o con el reloj
+// desfasado, una orden rechazada por vencida se vería como vigente.
+func (r *orderRepository) FindByQRCode(ctx context.Context, qrCode string) (*order.Order, bool, error) {
+	st, err := r.stmts.prepare(ctx, qOrderFindByQRCode)
+	if err != nil {
+		return nil, false, fmt.Errorf("orderRepo.FindByQRCode: %w", err)
+	}
+	var row struct {
+		order.Order
+		Expired bool `db:"expired"`
+	}
+	err = st.GetContext(ctx, &row, qrCode)
+	if errors.Is(err, sql.ErrNoRows) {
+		return nil, false, order.ErrNotFound
+	}
+	if err != nil {
+		return nil, false, fmt.Errorf("orderRepo.FindByQRCode: %w", err)
+	}
+	return &row.Order, row.Expired, nil
 }
 
-func (r *orderRepository) FindByQRCode(ctx context.Context, qrCode string) (*order.Order, error) {
+// ClaimDelivery busca la orden por QR, comprueba dueño, estado y deadline y
+// la marca entregada en un solo UPDATE. Dos escaneos simultáneos del mismo
+// QR no pueden entregarla dos veces: sólo uno encuentra la fila en 'ready'.
+func (r *orderRepository) ClaimDelivery(ctx context.Context, qrCode, ownerID string) (*order.Order, error) {
+	st, err := r.stmts.prepare(ctx, qOrderClaimDelivery)
+	if err != nil {
+		return nil, fmt.Errorf("orderRepo.ClaimDelivery: %w", err)
+	}
 	var o order.Order
-	err := r.db.GetContext(ctx, &o, `SELECT * FROM orders WHERE qr_code = $1`, qrCode)
+	err = st.GetContext(ctx, &o, qrCode, ownerID)
 	if errors.Is(err, sql.ErrNoRows) {
 		return nil, order.ErrNotFound
 	}
 	if err != nil {
-		return nil, fmt.Errorf("orderRepo.FindByQRCode: %w", err)
+		return nil, fmt.Errorf("orderRepo.ClaimDelivery: %w", err)
 	}
 	return &o, nil
 }
 
-func (r *orderRepository) CancelExpired(ctx context.Context) ([]string, error) {
-	// Primero obtenemos los IDs de las órdenes que vamos a cancelar
-	var ids []string
-	err := r.db.SelectContext(ctx, &ids, `
-		SELECT id FROM orders
-		WHERE type = 'reserved'
-		  AND status IN ('reserved','ready')
-		  AND pickup_deadline < NOW()`)
+// ConfirmPayment hace la transición en un UPDATE condicionado al estado
+// actual, en lugar de leer la orden (con sus items) y luego escribirla: una
+// ida a la BD y sin carrera entre dos webhooks del mismo pago.
+func (r *orderRepository) ConfirmPayment(ctx context.Context, id string) (bool, error) {
+	st, err := r.stmts.prepare(ctx, qOrderConfirmPayment)
+	if err != nil {
+		return false, fmt.Errorf("orderRepo.ConfirmPayment: %w", err)
+	}
+	res, err := st.ExecContext(ctx, id)
 	if err != nil {
-		return nil, fmt.Errorf("orderRepo.CancelExpired select: %w", err)
+		return false, fmt.Errorf("orderRepo.ConfirmPayment: %w", err)
 	}
+	n, _ := res.RowsAffected()
+	return n > 0, nil
+}
 
-	if len(ids) == 0 {
-		return nil, nil
+// Cancel condiciona el UPDATE al estado actual y devuelve el stock en la
+// misma transacción: dos cancelaciones simultáneas (o una cancelación y el
+// job de vencidas) no pueden pasar ambas, así que el stock se repone una
+// sola vez.
+func (r *orderRepository) Cancel(ctx context.Context, id string) (bool, error) {
+	tx, err := r.db.BeginTxx(ctx, nil)
+	if err != nil {
+		return false, fmt.Errorf("orderRepo.Cancel: %w", err)
 	}
+	defer tx.Rollback()
 
-	// Ahora cancelamos todas
-	_, err = r.db.ExecContext(ctx, `
+	var ids []string
+	err = tx.SelectContext(ctx, &ids, `
 		UPDATE orders
 		SET status = 'cancelled', updated_at = NOW()
-		WHERE type = 'reserved'
-		  AND status IN ('reserved','ready')
-		  AND pickup_deadline < NOW()`)
+		WHERE id = $1 AND status NOT IN ('delivered','cancelled')
+		RETURNING id`, id)
+	if err != nil {
+		return false, fmt.Errorf("orderRepo.Cancel: %w", err)
+	}
+	if len(ids) == 0 {
+		return false, nil
+	}
+	if err := restoreStock(ctx, tx, ids); err != nil {
+		return false, fmt.Errorf("orderRepo.Cancel stock: %w", err)
+	}
+	if err := tx.Commit(); err != nil {
+		return false, fmt.Errorf("orderRepo.Cancel: %w", err)
+	}
+	return true, nil
+}
+
+// CancelExpired cancela las reservas vencidas y devuelve su stock a los
+// productos en una sola transacción: un UPDATE de orders y otro de products,
+// sin un SELECT previo ni un UPDATE por producto.
+// Las órdenes bloqueadas por otra transacción (p. ej. un escaneo de QR en
+// curso, u otra instancia corriendo el job) se saltan con SKIP LOCKED y se
+// reintentan en la siguiente pasada, en lugar de esperar el lock.
+func (r *orderRepository) CancelExpired(ctx context.Context) ([]string, error) {
+	tx, err := r.db.BeginTxx(ctx, nil)
 	if err != nil {
-		return nil, fmt.Errorf("orderRepo.CancelExpired update: %w", err)
+		return nil, fmt.Errorf("orderRepo.CancelExpired: %w", err)
 	}
+	defer tx.Rollback()
 
+	var ids []string
+	err = tx.SelectContext(ctx, &ids, `
+		UPDATE orders
+		SET status = 'cancelled', updated_at = NOW()
+		WHERE id IN (
+			SELECT id FROM orders
+			WHERE type = 'reserved'
+			  AND status IN ('reserved','ready')
+			  AND pickup_deadline < NOW()
+			FOR UPDATE SKIP LOCKED
+		)
+		RETURNING id`)
+	if err != nil {
+		return nil, fmt.Errorf("orderRepo.CancelExpired: %w", err)
+	}
+	if len(ids) == 0 {
+		return nil, nil
+	}
+	if err := restoreStock(ctx, tx, ids); err != nil {
+		return nil, fmt.Errorf("orderRepo.CancelExpired stock: %w", err)
+	}
+	if err := tx.Commit(); err != nil {
+		return nil, fmt.Errorf("orderRepo.CancelExpired: %w", err)
+	}
 	return ids, nil
 }
+
+// lockProducts bloquea las filas de los productos en orden de id. Place,
+// Cancel y CancelExpired toman así los locks siempre en el mismo orden; si
+// el UPDATE los tomara en el orden en que recorre las filas, dos
+// transacciones sobre los mismos productos podrían esperarse mutuamente
+// (deadlock, 40P01).
+func lockProducts(ctx context.Context, tx *sqlx.Tx, ids []string) error {
+	_, err := tx.ExecContext(ctx, `
+		SELECT id FROM products
+		WHERE id = ANY($1::bpchar[])
+		ORDER BY id
+		FOR UPDATE`, pq.Array(ids))
+	return err
+}
+
+// restoreStock devuelve al inventario el stock de las órdenes dadas. Los
+// productos se bloquean antes en orden de id, igual que en lockProducts.
+func restoreStock(ctx context.Context, tx *sqlx.Tx, orderIDs []string) error {
+	_, err := tx.ExecContext(ctx, `
+		SELECT id FROM products
+		WHERE id IN (SELECT product_id FROM order_items WHERE order_id = ANY($1::bpchar[]))
+		ORDER BY id
+		FOR UPDATE`, pq.Array(orderIDs))
+	if err != nil {
+		return err
+	}
+	_, err = tx.ExecContext(ctx, `
+		UPDATE products p
+		SET stock = p.stock + q.qty
+		FROM (
+			SELECT product_id, SUM(quantity) AS qty
+			FROM order_items
+			WHERE order_id = ANY($1::bpchar[])
+			GROUP BY product_id
+		) q
+		WHERE p.id = q.product_id`, pq.Array(orderIDs))
+	return err
+}
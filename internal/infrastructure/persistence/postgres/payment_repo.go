@@ -4,12 +4,15 @@ import (
 	"context"
 	"database/sql"
 	"errors"
+	"fmt"
 
 	"github.com/jmoiron/sqlx"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/payment"
 )
 
+var errPaymentNotFound = errors.New("payment not found")
+
 type paymentRepository struct {
 	db *sqlx.DB
 }
@@ -18,24 +21,53 @@ func NewPaymentRepository(db *sqlx.DB) payment.PaymentRepository {
 	return &paymentRepository{db: db}
 }
 
+// Save inserta el pago y recupera created_at/updated_at con RETURNING en la
+// misma sentencia, igual que orderRepo.Place.
 func (r *paymentRepository) Save(ctx context.Context, p *payment.Payment) error {
 	q := `INSERT INTO payments (id, order_id, amount, commission, method, status, mp_payment_id)
-	      VALUES (:id, :order_id, :amount, :commission, :method, :status, :mp_payment_id)`
-	_, err := r.db.NamedExecContext(ctx, q, p)
-	return err
+	      VALUES ($1, $2, $3, $4, $5, $6, $7)
+	      RETURNING created_at, updated_at`
+	err := r.db.QueryRowxContext(ctx, q,
+		p.ID, p.OrderID, p.Amount, p.Commission, p.Method, p.Status, p.MPPaymentID).
+		Scan(&p.CreatedAt, &p.UpdatedAt)
+	if err != nil {
+		return fmt.Errorf("paymentRepo.Save: %w", err)
+	}
+	return nil
 }
 
+// Update es una sola sentencia posicional (sin compilar la consulta nombrada
+// ni reflejar el struct) y devuelve updated_at con RETURNING para que el
+// pago en memoria quede igual a la fila sin volver a leerla.
 func (r *paymentRepository) Update(ctx context.Context, p *payment.Payment) error {
-	q := `UPDATE payments SET status=:status, mp_payment_id=:mp_payment_id, updated_at=NOW() WHERE id=:id`
-	_, err := r.db.NamedExecContext(ctx, q, p)
-	return err
+	q := `UPDATE payments SET status=$1, mp_payment_id=$2, updated_at=NOW() WHERE id=$3
+	      RETURNING updated_at`
+	err := r.db.QueryRowxContext(ctx, q, p.Status, p.MPPaymentID, p.ID).Scan(&p.UpdatedAt)
+	if errors.Is(err, sql.ErrNoRows) {
+		return errPaymentNotFound
+	}
+	if err != nil {
+		return fmt.Errorf("paymentRepo.Update: %w", err)
+	}
+	return nil
+}
+
+// LinkMPPayment actualiza directamente por order_id, sin leer antes el pago.
+func (r *paymentRepository) LinkMPPayment(ctx context.Context, orderID, mpPaymentID string) (bool, error) {
+	res, err := r.db.ExecContext(ctx,
+		`UPDATE payments SET mp_payment_id=$1, updated_at=NOW() WHERE order_id=$2`, mpPaymentID, orderID)
+	if err != nil {
+		return false, fmt.Errorf("paymentRepo.LinkMPPayment: %w", err)
+	}
+	n, _ := res.RowsAffected()
+	return n > 0, nil
 }
 
 func (r *paymentRepository) FindByOrderID(ctx context.Context, orderID string) (*payment.Payment, error) {
 	var p payment.Payment
 	err := r.db.GetContext(ctx, &p, `SELECT * FROM payments WHERE order_id = $1`, orderID)
 	if errors.Is(err, sql.ErrNoRows) {
-		return nil, errors.New("payment not found")
+		return nil, errPaymentNotFound
 	}
 	return &p, err
 }
@@ -44,7 +76,7 @@ func (r *paymentRepository) FindByMPPaymentID(ctx context.Context, mpPaymentID s
 	var p payment.Payment
 	err := r.db.GetContext(ctx, &p, `SELECT * FROM payments WHERE mp_payment_id = $1`, mpPaymentID)
 	if errors.Is(err, sql.ErrNoRows) {
-		return nil, errors.New("payment not found")
+		return nil, errPaymentNotFound
 	}
 	return &p, err
 }
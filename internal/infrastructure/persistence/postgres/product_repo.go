@@ -7,40 +7,167 @@ import (
 	"fmt"
 
 	"github.com/jmoiron/sqlx"
+	"github.com/lib/pq"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/product"
 )
 
 type productRepository struct {
-	db *sqlx.DB
+	db    *sqlx.DB
+	stmts *stmtCache
 }
 
 func NewProductRepository(db *sqlx.DB) product.Repository {
-	return &productRepository{db: db}
+	return &productRepository{db: db, stmts: newStmtCache(db)}
 }
 
+// Save usa parámetros posicionales y devuelve los timestamps con RETURNING:
+// una sola sentencia y el producto en memoria queda igual a la fila, sin
+// volver a leerla para la respuesta.
 func (r *productRepository) Save(ctx context.Context, p *product.Product) error {
 	q := `INSERT INTO products (id, business_id, name, description, price, stock, image_url, active)
-	      VALUES (:id, :business_id, :name, :description, :price, :stock, :image_url, :active)`
-	_, err := r.db.NamedExecContext(ctx, q, p)
-	return err
+	      VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+	      RETURNING created_at, updated_at`
+	err := r.db.QueryRowxContext(ctx, q,
+		p.ID, p.BusinessID, p.Name, p.Description, p.Price, p.Stock, p.ImageURL, p.Active).
+		Scan(&p.CreatedAt, &p.UpdatedAt)
+	if err != nil {
+		return fmt.Errorf("productRepo.Save: %w", err)
+	}
+	return nil
+}
+
+// productColumns fija el orden de columnas que espera scanProducts.
+const productColumns = `id, business_id, name, description, price, stock,
+	      image_url, active, created_at, updated_at`
+
+// scanProducts lee las filas por posición. En los listados evita el
+// mapeo por reflexión de sqlx (buscar cada columna en el mapa de campos y
+// resolver el campo con reflect) en cada fila.
+func scanProducts(rows *sql.Rows) ([]*product.Product, error) {
+	defer rows.Close()
+	var list []*product.Product
+	for rows.Next() {
+		p := new(product.Product)
+		err := rows.Scan(&p.ID, &p.BusinessID, &p.Name, &p.Description, &p.Price, &p.Stock,
+			&p.ImageURL, &p.Active, &p.CreatedAt, &p.UpdatedAt)
+		if err != nil {
+			return nil, err
+		}
+		list = append(list, p)
+	}
+	return list, rows.Err()
+}
+
+// Lecturas del catálogo y de la creación de órdenes; se ejecutan como
+// statements preparados (ver stmtCache).
+const (
+	qProductFindByID = `SELECT ` + productColumns + ` FROM products WHERE id = $1 AND active = TRUE`
+
+	qProductFindByIDs = `SELECT ` + productColumns + ` FROM products WHERE id = ANY($1) AND active = TRUE`
+
+	// Primera página y páginas con cursor van en sentencias separadas: con
+	// un "$2 IS NULL OR ..." el plan genérico del statement preparado no
+	// podría arrancar el rango del índice en el cursor.
+	qProductFindByBusiness = `
+		SELECT ` + productColumns + ` FROM products
+		WHERE business_id = $1 AND active = TRUE
+		ORDER BY name, id
+		LIMIT $2`
+
+	qProductFindByBusinessAfter = `
+		SELECT ` + productColumns + ` FROM products
+		WHERE business_id = $1 AND active = TRUE
+		  AND (name, id) > ($2, $3::bpchar)
+		ORDER BY name, id
+		LIMIT $4`
+
+	// El cursor puede ser un producto ya dado de baja, pero debe ser del
+	// mismo negocio. $1 va como bpchar, el tipo de products.id, para que
+	// la búsqueda use la PK.
+	qProductCursorName = `SELECT name FROM products WHERE id = $1::bpchar AND business_id = $2`
+)
+
+// ownedReturning devuelve la fila completa tras un UPDATE ... FROM businesses.
+const ownedReturning = `RETURNING p.id, p.business_id, p.name, p.description, p.price, p.stock,
+	      p.image_url, p.active, p.created_at, p.updated_at`
+
+// UpdateOwned verifica la propiedad con un join contra businesses en el
+// mismo UPDATE, en lugar de leer el producto y luego su negocio.
+func (r *productRepository) UpdateOwned(ctx context.Context, p *product.Product, ownerID string) error {
+	q := `UPDATE products p
+	      SET name=$1, description=$2, price=$3, stock=$4, image_url=$5, updated_at=NOW()
+	      FROM businesses b
+	      WHERE p.id=$6 AND p.active = TRUE
+	        AND b.id = p.business_id AND b.owner_id=$7 AND b.active = TRUE
+	      ` + ownedReturning
+	err := r.db.QueryRowxContext(ctx, q,
+		p.Name, p.Description, p.Price, p.Stock, p.ImageURL, p.ID, ownerID).StructScan(p)
+	if errors.Is(err, sql.ErrNoRows) {
+		return r.ownedMiss(ctx, p.ID)
+	}
+	if err != nil {
+		return fmt.Errorf("productRepo.UpdateOwned: %w", err)
+	}
+	return nil
+}
+
+func (r *productRepository) UpdateStockOwned(ctx context.Context, id, ownerID string, stock int) (*product.Product, error) {
+	q := `UPDATE products p
+	      SET stock=$1, updated_at=NOW()
+	      FROM businesses b
+	      WHERE p.id=$2 AND p.active = TRUE
+	        AND b.id = p.business_id AND b.owner_id=$3 AND b.active = TRUE
+	      ` + ownedReturning
+	var p product.Product
+	err := r.db.QueryRowxContext(ctx, q, stock, id, ownerID).StructScan(&p)
+	if errors.Is(err, sql.ErrNoRows) {
+		return nil, r.ownedMiss(ctx, id)
+	}
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.UpdateStockOwned: %w", err)
+	}
+	return &p, nil
 }
 
-func (r *productRepository) Update(ctx context.Context, p *product.Product) error {
-	q := `UPDATE products SET name=:name, description=:description, price=:price,
-	      stock=:stock, image_url=:image_url, active=:active WHERE id=:id`
-	_, err := r.db.NamedExecContext(ctx, q, p)
-	return err
+func (r *productRepository) DeleteOwned(ctx context.Context, id, ownerID string) error {
+	res, err := r.db.ExecContext(ctx, `
+		UPDATE products p
+		SET active = FALSE, updated_at = NOW()
+		FROM businesses b
+		WHERE p.id=$1 AND p.active = TRUE
+		  AND b.id = p.business_id AND b.owner_id=$2 AND b.active = TRUE`, id, ownerID)
+	if err != nil {
+		return fmt.Errorf("productRepo.DeleteOwned: %w", err)
+	}
+	if n, _ := res.RowsAffected(); n == 0 {
+		return r.ownedMiss(ctx, id)
+	}
+	return nil
 }
 
-func (r *productRepository) Delete(ctx context.Context, id string) error {
-	_, err := r.db.ExecContext(ctx, `UPDATE products SET active = FALSE WHERE id = $1`, id)
-	return err
+// ownedMiss distingue, sólo cuando la escritura no tocó ninguna fila, entre
+// producto inexistente (404) y producto ajeno (403).
+func (r *productRepository) ownedMiss(ctx context.Context, id string) error {
+	var exists bool
+	err := r.db.GetContext(ctx, &exists,
+		`SELECT EXISTS(SELECT 1 FROM products WHERE id = $1 AND active = TRUE)`, id)
+	if err != nil {
+		return fmt.Errorf("productRepo.ownedMiss: %w", err)
+	}
+	if exists {
+		return product.ErrUnauthorized
+	}
+	return product.ErrNotFound
 }
 
 func (r *productRepository) FindByID(ctx context.Context, id string) (*product.Product, error) {
+	st, err := r.stmts.prepare(ctx, qProductFindByID)
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.FindByID: %w", err)
+	}
 	var p product.Product
-	err := r.db.GetContext(ctx, &p, `SELECT * FROM products WHERE id = $1 AND active = TRUE`, id)
+	err = st.GetContext(ctx, &p, id)
 	if errors.Is(err, sql.ErrNoRows) {
 		return nil, product.ErrNotFound
 	}
@@ -50,23 +177,62 @@ func (r *productRepository) FindByID(ctx context.Context, id string) (*product.P
 	return &p, nil
 }
 
-func (r *productRepository) FindByBusiness(ctx context.Context, businessID string) ([]*product.Product, error) {
-	var list []*product.Product
-	err := r.db.SelectContext(ctx, &list,
-		`SELECT * FROM products WHERE business_id = $1 AND active = TRUE ORDER BY name`, businessID)
-	return list, err
+func (r *productRepository) FindByIDs(ctx context.Context, ids []string) ([]*product.Product, error) {
+	st, err := r.stmts.prepare(ctx, qProductFindByIDs)
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.FindByIDs: %w", err)
+	}
+	rows, err := st.QueryContext(ctx, pq.Array(ids))
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.FindByIDs: %w", err)
+	}
+	list, err := scanProducts(rows)
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.FindByIDs: %w", err)
+	}
+	return list, nil
 }
 
-// DecreaseStock decrementa el stock de forma atómica con UPDATE condicional.
-func (r *productRepository) DecreaseStock(ctx context.Context, productID string, qty int) error {
-	res, err := r.db.ExecContext(ctx,
-		`UPDATE products SET stock = stock - $1 WHERE id = $2 AND stock >= $1`, qty, productID)
-	if err != nil {
-		return fmt.Errorf("productRepo.DecreaseStock: %w", err)
+// FindByBusiness ordena por (name, id) para que el cursor sea estable aunque
+// haya nombres repetidos. El cliente sólo manda el ID del último producto;
+// su nombre se busca por PK y la página arranca en (name, id) dentro de
+// idx_products_business_name.
+func (r *productRepository) FindByBusiness(ctx context.Context, businessID string, page product.Page) ([]*product.Product, error) {
+	var rows *sql.Rows
+	if page.After == "" {
+		st, err := r.stmts.prepare(ctx, qProductFindByBusiness)
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
+		}
+		rows, err = st.QueryContext(ctx, businessID, limitArg(page.Limit))
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
+		}
+	} else {
+		cur, err := r.stmts.prepare(ctx, qProductCursorName)
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
+		}
+		var name string
+		err = cur.GetContext(ctx, &name, page.After, businessID)
+		if errors.Is(err, sql.ErrNoRows) {
+			return nil, product.ErrInvalidCursor
+		}
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness cursor: %w", err)
+		}
+		st, err := r.stmts.prepare(ctx, qProductFindByBusinessAfter)
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
+		}
+		rows, err = st.QueryContext(ctx, businessID, name, page.After, limitArg(page.Limit))
+		if err != nil {
+			return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
+		}
 	}
-	n, _ := res.RowsAffected()
-	if n == 0 {
-		return product.ErrNoStock
+	list, err := scanProducts(rows)
+	if err != nil {
+		return nil, fmt.Errorf("productRepo.FindByBusiness: %w", err)
 	}
-	return nil
+	return list, nil
 }
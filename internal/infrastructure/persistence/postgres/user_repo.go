@@ -12,17 +12,37 @@ import (
 )
 
 type userRepository struct {
-	db *sqlx.DB
+	db    *sqlx.DB
+	stmts *stmtCache
 }
 
 func NewUserRepository(db *sqlx.DB) user.Repository {
-	return &userRepository{db: db}
+	return &userRepository{db: db, stmts: newStmtCache(db)}
 }
 
+// Búsquedas por clave del login y de la carga del perfil; se ejecutan como
+// statements preparados (ver stmtCache), con columnas explícitas.
+const (
+	userColumns = `id, name, email, password, role, active, created_at, updated_at`
+
+	qUserFindByID = `SELECT ` + userColumns + ` FROM users WHERE id = $1 AND active = TRUE`
+
+	qUserFindByEmail = `SELECT ` + userColumns + ` FROM users WHERE email = $1 AND active = TRUE`
+)
+
+// Save inserta el usuario; si el email ya existe devuelve user.ErrEmailTaken
+// sin necesidad de una consulta previa de existencia. created_at/updated_at
+// vuelven en el mismo INSERT (RETURNING) en lugar de releer la fila.
 func (r *userRepository) Save(ctx context.Context, u *user.User) error {
 	q := `INSERT INTO users (id, name, email, password, role, active)
-	      VALUES (:id, :name, :email, :password, :role, :active)`
-	_, err := r.db.NamedExecContext(ctx, q, u)
+	      VALUES ($1, $2, $3, $4, $5, $6)
+	      ON CONFLICT (email) DO NOTHING
+	      RETURNING created_at, updated_at`
+	err := r.db.QueryRowxContext(ctx, q, u.ID, u.Name, u.Email, u.Password, u.Role, u.Active).
+		Scan(&u.CreatedAt, &u.UpdatedAt)
+	if errors.Is(err, sql.ErrNoRows) {
+		return user.ErrEmailTaken
+	}
 	if err != nil {
 		return fmt.Errorf("userRepo.Save: %w", err)
 	}
@@ -30,8 +50,12 @@ func (r *userRepository) Save(ctx context.Context, u *user.User) error {
 }
 
 func (r *userRepository) FindByID(ctx context.Context, id string) (*user.User, error) {
+	st, err := r.stmts.prepare(ctx, qUserFindByID)
+	if err != nil {
+		return nil, fmt.Errorf("userRepo.FindByID: %w", err)
+	}
 	var u user.User
-	err := r.db.GetContext(ctx, &u, `SELECT * FROM users WHERE id = $1 AND active = TRUE`, id)
+	err = st.GetContext(ctx, &u, id)
 	if errors.Is(err, sql.ErrNoRows) {
 		return nil, user.ErrNotFound
 	}
@@ -42,8 +66,12 @@ func (r *userRepository) FindByID(ctx context.Context, id string) (*user.User, e
 }
 
 func (r *userRepository) FindByEmail(ctx context.Context, email string) (*user.User, error) {
+	st, err := r.stmts.prepare(ctx, qUserFindByEmail)
+	if err != nil {
+		return nil, fmt.Errorf("userRepo.FindByEmail: %w", err)
+	}
 	var u user.User
-	err := r.db.GetContext(ctx, &u, `SELECT * FROM users WHERE email = $1 AND active = TRUE`, email)
+	err = st.GetContext(ctx, &u, email)
 	if errors.Is(err, sql.ErrNoRows) {
 		return nil, user.ErrNotFound
 	}
@@ -52,9 +80,3 @@ func (r *userRepository) FindByEmail(ctx context.Context, email string) (*user.U
 	}
 	return &u, nil
 }
-
-func (r *userRepository) ExistsByEmail(ctx context.Context, email string) (bool, error) {
-	var count int
-	err := r.db.GetContext(ctx, &count, `SELECT COUNT(*) FROM users WHERE email = $1`, email)
-	return count > 0, err
-}
@@ -5,6 +5,7 @@ import (
 	"fmt"
 	"log"
 	"net/http"
+	"net/http/pprof"
 	"os"
 	"os/signal"
 	"syscall"
@@ -14,11 +15,14 @@ import (
 	_ "github.com/lib/pq"
 
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/application/services"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/domain/order"
 	infraHTTP "github.com/RodrigoCampuzano/Api_ISmartSell/internal/infrastructure/http"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/infrastructure/http/handler"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/infrastructure/persistence/cache"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/internal/infrastructure/persistence/postgres"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/config"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/jwt"
+	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/password"
 	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/qr"
 )
 
@@ -30,18 +34,31 @@ func main() {
 	if err != nil {
 		log.Fatalf("db connect: %v", err)
 	}
-	db.SetMaxOpenConns(25)
-	db.SetMaxIdleConns(10)
-	db.SetConnMaxLifetime(5 * time.Minute)
+	// Mantener tantas conexiones ociosas como abiertas evita cerrar y
+	// reabrir conexiones (TCP + auth) en cada pico de tráfico.
+	db.SetMaxOpenConns(cfg.DBMaxOpenConns)
+	db.SetMaxIdleConns(cfg.DBMaxIdleConns)
+	db.SetConnMaxLifetime(cfg.DBConnMaxLife)
+	// Cerrar por nuestra cuenta las conexiones ociosas antes de que el
+	// servidor (o un balanceador) las corte evita que la primera consulta
+	// tras un rato sin tráfico falle y tenga que reconectar.
+	db.SetConnMaxIdleTime(cfg.DBConnMaxIdle)
 	defer db.Close()
 
+	warmCtx, cancelWarm := context.WithTimeout(context.Background(), 10*time.Second)
+	if err := postgres.WarmPool(warmCtx, db, cfg.DBMaxIdleConns); err != nil {
+		log.Printf("db warm-up: %v", err)
+	}
+	cancelWarm()
+
 	// ── Servicios compartidos ───────────────────────────────
 	jwtSvc := jwt.NewService(cfg.JWTSecret, cfg.JWTTTLHrs)
 	qrSvc := qr.NewService()
+	pwdSvc := password.NewService(cfg.BcryptCost)
 
 	// ── Repositorios (adaptadores de salida) ────────────────
-	userRepo := postgres.NewUserRepository(db)
-	businessRepo := postgres.NewBusinessRepository(db)
+	userRepo := cache.NewUserRepository(postgres.NewUserRepository(db), cfg.UserCacheTTL)
+	businessRepo := cache.NewBusinessRepository(postgres.NewBusinessRepository(db), cfg.BusinessCacheTTL)
 	productRepo := postgres.NewProductRepository(db)
 	orderRepo := postgres.NewOrderRepository(db)
 	fcmRepo := postgres.NewFCMRepository(db)
@@ -49,7 +66,7 @@ func main() {
 	sellerCredRepo := postgres.NewSellerCredentialRepository(db)
 
 	// ── Servicios de aplicación (casos de uso) ──────────────
-	userSvc := services.NewUserService(userRepo, jwtSvc)
+	userSvc := services.NewUserService(userRepo, jwtSvc, pwdSvc)
 	businessSvc := services.NewBusinessService(businessRepo)
 	productSvc := services.NewProductService(productRepo, businessRepo)
 
@@ -71,26 +88,31 @@ func main() {
 	}
 
 	// ── Job: cancelar pedidos expirados cada 5 min ──────────
+	jobCtx, stopJobs := context.WithCancel(context.Background())
+	defer stopJobs()
+	jobsDone := make(chan struct{})
 	go func() {
-		ticker := time.NewTicker(5 * time.Minute)
-		defer ticker.Stop()
-		for range ticker.C {
-			ids, err := orderRepo.(interface {
-				CancelExpired(context.Context) ([]string, error)
-			}).CancelExpired(context.Background())
-			if err != nil {
-				log.Printf("cancelExpired: %v", err)
-			} else if len(ids) > 0 {
-				log.Printf("cancelExpired: %d orders cancelled, processing refunds...", len(ids))
-				for _, id := range ids {
-					if err := paymentSvc.CancelPayment(context.Background(), id); err != nil {
-						log.Printf("cancelExpired refund orderID=%s: %v", id, err)
-					}
-				}
-			}
-		}
+		defer close(jobsDone)
+		cancelExpiredLoop(jobCtx, orderRepo, paymentSvc, 5*time.Minute)
 	}()
 
+	// ── Profiling (opcional) ─────────────────────────────────
+	// En un puerto aparte y sólo si se configura, para no exponerlo por la
+	// API pública. Con él se obtiene el perfil default.pgo para compilar con PGO.
+	if cfg.PprofAddr != "" {
+		go func() {
+			mux := http.NewServeMux()
+			mux.HandleFunc("/debug/pprof/", pprof.Index)
+			mux.HandleFunc("/debug/pprof/profile", pprof.Profile)
+			mux.HandleFunc("/debug/pprof/symbol", pprof.Symbol)
+			mux.HandleFunc("/debug/pprof/trace", pprof.Trace)
+			log.Printf("pprof listening on %s", cfg.PprofAddr)
+			if err := http.ListenAndServe(cfg.PprofAddr, mux); err != nil {
+				log.Printf("pprof: %v", err)
+			}
+		}()
+	}
+
 	// ── Servidor HTTP ────────────────────────────────────────
 	srv := &http.Server{
 		Addr:         cfg.Addr(),
@@ -112,10 +134,45 @@ func main() {
 	signal.Notify(quit, syscall.SIGINT, syscall.SIGTERM)
 	<-quit
 
+	stopJobs()
 	ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
 	defer cancel()
 	if err := srv.Shutdown(ctx); err != nil {
-		log.Fatalf("shutdown: %v", err)
+		log.Printf("shutdown: %v", err)
 	}
+	// Esperar a que termine la pasada del job en curso (con sus reembolsos)
+	// antes de que el defer cierre la BD.
+	<-jobsDone
 	log.Println("server stopped")
 }
+
+// cancelExpiredLoop cancela periódicamente las reservas vencidas y reembolsa
+// sus pagos. Termina cuando ctx se cancela (apagado del servidor).
+func cancelExpiredLoop(ctx context.Context, orderRepo order.Repository, paymentSvc services.PaymentService, every time.Duration) {
+	ticker := time.NewTicker(every)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-ctx.Done():
+			return
+		case <-ticker.C:
+		}
+
+		// Una pasada ya iniciada termina aunque llegue el apagado: las órdenes
+		// canceladas deben quedar con su reembolso en curso.
+		passCtx := context.WithoutCancel(ctx)
+		ids, err := orderRepo.CancelExpired(passCtx)
+		if err != nil {
+			log.Printf("cancelExpired: %v", err)
+			continue
+		}
+		if len(ids) > 0 {
+			log.Printf("cancelExpired: %d orders cancelled, processing refunds...", len(ids))
+			for _, id := range ids {
+				if err := paymentSvc.CancelPayment(passCtx, id); err != nil {
+					log.Printf("cancelExpired refund orderID=%s: %v", id, err)
+				}
+			}
+		}
+	}
+}
@@ -0,0 +1,23 @@
+-- ============================================================
+--  Migración: índices para los filtros reales de orders/payments
+--  Ejecutar sobre la BD pos_app existente
+--  (CONCURRENTLY no bloquea escrituras; psql -f corre cada
+--   sentencia fuera de transacción, así que es válido aquí)
+-- ============================================================
+
+-- 1. Los índices de listados por comprador / negocio están en
+--    004_order_cursor_indexes.sql.
+
+-- 2. Job de reservas vencidas: solo indexa las reservas aún activas, así el
+--    escaneo recorre las pendientes de vencer y no toda la tabla.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_reserved_deadline
+    ON orders(pickup_deadline)
+    WHERE type = 'reserved' AND status IN ('reserved','ready');
+
+-- 3. Búsqueda de orden por QR al escanear en tienda.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_qr_code
+    ON orders(qr_code) WHERE qr_code IS NOT NULL;
+
+-- 4. El webhook de Mercado Pago busca el pago por order_id (ya indexado por
+--    su UNIQUE), no por mp_payment_id: se quita el índice que se creaba aquí.
+DROP INDEX CONCURRENTLY IF EXISTS idx_payments_mp_payment;
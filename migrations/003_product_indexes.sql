@@ -0,0 +1,15 @@
+-- ============================================================
+--  Migración: índice del catálogo paginado por negocio
+--  Ejecutar sobre la BD pos_app existente
+--  (CONCURRENTLY no bloquea escrituras; psql -f corre cada
+--   sentencia fuera de transacción, así que es válido aquí)
+-- ============================================================
+
+-- GET /businesses/{id}/products: WHERE business_id = $1 AND active = TRUE
+-- ORDER BY name, id con cursor (name, id) > (...). El índice parcial da las
+-- filas ya ordenadas y el cursor es un rango dentro de él: sin sort y sin
+-- leer los productos dados de baja.
+-- idx_products_business se mantiene: cubre también los inactivos, que son
+-- los que recorre el ON DELETE CASCADE desde businesses.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_business_name
+    ON products(business_id, name, id) WHERE active = TRUE;
@@ -0,0 +1,22 @@
+-- ============================================================
+--  Migración: índices del cursor (created_at, id) de órdenes
+--  Ejecutar sobre la BD pos_app existente
+--  (CONCURRENTLY no bloquea escrituras; psql -f corre cada
+--   sentencia fuera de transacción, así que es válido aquí)
+-- ============================================================
+
+-- Listados por comprador / negocio: ORDER BY created_at DESC, id DESC con
+-- cursor (created_at, id) < (...). Con id en el índice el cursor es un rango
+-- y las órdenes del mismo instante salen ya ordenadas, sin sort.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_buyer_created_id
+    ON orders(buyer_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_business_created_id
+    ON orders(business_id, created_at DESC, id DESC);
+
+-- Los índices anteriores quedan cubiertos por el prefijo de los nuevos: los
+-- simples del schema original y los (x_id, created_at) que creaba antes
+-- 002_order_indexes.sql.
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_buyer;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_business;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_buyer_created;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_business_created;
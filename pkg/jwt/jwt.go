@@ -6,6 +6,8 @@ import (
 	"time"
 
 	"github.com/golang-jwt/jwt/v5"
+
+	"github.com/RodrigoCampuzano/Api_ISmartSell/pkg/ttlmap"
 )
 
 var ErrInvalidToken = errors.New("jwt: invalid token")
@@ -16,42 +18,62 @@ type Claims struct {
 	jwt.RegisteredClaims
 }
 
+// Los tokens ya verificados se recuerdan un rato para no repetir la
+// decodificación y el HMAC en cada petición del mismo cliente.
+const (
+	cacheTTL  = time.Minute
+	cacheSize = 10000
+)
+
 type Service struct {
-	secret []byte
-	ttl    time.Duration
+	secret  []byte
+	ttl     time.Duration
+	parser  *jwt.Parser
+	keyFunc jwt.Keyfunc
+	cache   *ttlmap.Map[string, Claims]
 }
 
 func NewService(secret string, ttlHours int) *Service {
-	return &Service{
+	s := &Service{
 		secret: []byte(secret),
 		ttl:    time.Duration(ttlHours) * time.Hour,
+		// Sólo se aceptan tokens HS256: el parser rechaza cualquier otro
+		// "alg" antes de verificar la firma.
+		parser: jwt.NewParser(jwt.WithValidMethods([]string{jwt.SigningMethodHS256.Alg()})),
+		cache:  ttlmap.New[string, Claims](cacheSize),
 	}
+	// El parser y el keyfunc se construyen una sola vez en lugar de en cada Parse.
+	s.keyFunc = func(*jwt.Token) (any, error) { return s.secret, nil }
+	return s
 }
 
+// Generate firma un token HS256.
 func (s *Service) Generate(userID, role string) (string, error) {
+	now := time.Now()
 	claims := Claims{
 		UserID: userID,
 		Role:   role,
 		RegisteredClaims: jwt.RegisteredClaims{
-			ExpiresAt: jwt.NewNumericDate(time.Now().Add(s.ttl)),
-			IssuedAt:  jwt.NewNumericDate(time.Now()),
+			ExpiresAt: jwt.NewNumericDate(now.Add(s.ttl)),
+			IssuedAt:  jwt.NewNumericDate(now),
 		},
 	}
-	t := jwt.NewWithClaims(jwt.SigningMethodHS256, claims)
-	token, err := t.SignedString(s.secret)
+	token, err := jwt.NewWithClaims(jwt.SigningMethodHS256, claims).SignedString(s.secret)
 	if err != nil {
 		return "", fmt.Errorf("jwt.Generate: %w", err)
 	}
+
+	// El cliente usará el token enseguida: se deja ya verificado en caché.
+	s.remember(token, claims, now)
 	return token, nil
 }
 
 func (s *Service) Parse(tokenStr string) (*Claims, error) {
-	t, err := jwt.ParseWithClaims(tokenStr, &Claims{}, func(t *jwt.Token) (any, error) {
-		if _, ok := t.Method.(*jwt.SigningMethodHMAC); !ok {
-			return nil, fmt.Errorf("unexpected signing method: %v", t.Header["alg"])
-		}
-		return s.secret, nil
-	})
+	if claims, ok := s.cache.Get(tokenStr); ok {
+		return &claims, nil
+	}
+
+	t, err := s.parser.ParseWithClaims(tokenStr, &Claims{}, s.keyFunc)
 	if err != nil || !t.Valid {
 		return nil, ErrInvalidToken
 	}
@@ -59,5 +81,16 @@ func (s *Service) Parse(tokenStr string) (*Claims, error) {
 	if !ok {
 		return nil, ErrInvalidToken
 	}
+	s.remember(tokenStr, *claims, time.Now())
 	return claims, nil
 }
+
+// remember guarda los claims hasta cacheTTL o hasta que expire el token,
+// lo que ocurra primero.
+func (s *Service) remember(tokenStr string, claims Claims, now time.Time) {
+	expires := now.Add(cacheTTL)
+	if claims.ExpiresAt != nil && claims.ExpiresAt.Time.Before(expires) {
+		expires = claims.ExpiresAt.Time
+	}
+	s.cache.Set(tokenStr, claims, expires)
+}
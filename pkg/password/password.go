@@ -0,0 +1,70 @@
+package password
+
+import (
+	"context"
+	"fmt"
+	"runtime"
+
+	"golang.org/x/crypto/bcrypt"
+)
+
+// DefaultCost es el factor de trabajo de bcrypt usado si no se configura
+// otro. Se fija aquí en lugar de heredar bcrypt.DefaultCost para que
+// cualquier cambio en el costo de login/registro sea deliberado.
+const DefaultCost = 10
+
+// Service hashea y verifica contraseñas con bcrypt.
+// Cada operación ocupa un núcleo durante decenas de milisegundos, así que
+// se limita a runtime.NumCPU() cálculos simultáneos: una ráfaga de logins
+// no puede acaparar todos los núcleos y dejar sin CPU al resto de rutas.
+type Service struct {
+	cost  int
+	slots chan struct{}
+}
+
+func NewService(cost int) *Service {
+	if cost < bcrypt.MinCost || cost > bcrypt.MaxCost {
+		cost = DefaultCost
+	}
+	return &Service{
+		cost:  cost,
+		slots: make(chan struct{}, runtime.NumCPU()),
+	}
+}
+
+// acquire espera un slot libre o a que se cancele ctx: si el cliente se
+// desconecta mientras hay cola, su petición sale sin haber gastado CPU.
+func (s *Service) acquire(ctx context.Context) error {
+	select {
+	case s.slots <- struct{}{}:
+		return nil
+	case <-ctx.Done():
+		return ctx.Err()
+	}
+}
+
+func (s *Service) release() { <-s.slots }
+
+// Hash devuelve el hash bcrypt de la contraseña en texto plano.
+func (s *Service) Hash(ctx context.Context, plain string) (string, error) {
+	if err := s.acquire(ctx); err != nil {
+		return "", fmt.Errorf("password.Hash: %w", err)
+	}
+	defer s.release()
+
+	hash, err := bcrypt.GenerateFromPassword([]byte(plain), s.cost)
+	if err != nil {
+		return "", fmt.Errorf("password.Hash: %w", err)
+	}
+	return string(hash), nil
+}
+
+// Compare devuelve nil si plain corresponde al hash.
+func (s *Service) Compare(ctx context.Context, hash, plain string) error {
+	if err := s.acquire(ctx); err != nil {
+		return fmt.Errorf("password.Compare: %w", err)
+	}
+	defer s.release()
+
+	return bcrypt.CompareHashAndPassword([]byte(hash), []byte(plain))
+}
@@ -1,6 +1,7 @@
 package qr
 
 import (
+	"crypto/rand"
 	"encoding/base64"
 	"fmt"
 
@@ -12,6 +13,16 @@ type Service struct{}
 
 func NewService() *Service { return &Service{} }
 
+// NewToken devuelve el código aleatorio que se imprime en el QR de una
+// orden: 16 bytes de crypto/rand en base64url (22 caracteres). Tiene la
+// misma entropía que un UUID v4 pero es más corto, así que el QR sale con
+// menos módulos y el índice de qr_code es más chico.
+func (s *Service) NewToken() string {
+	var b [16]byte
+	_, _ = rand.Read(b[:]) // crypto/rand.Read no falla en plataformas soportadas
+	return base64.RawURLEncoding.EncodeToString(b[:])
+}
+
 // Generate devuelve un string único para el pedido y el PNG en base64.
 // El "token" del QR es simplemente el orderID; en producción podrías
 // añadir una firma HMAC para mayor seguridad.
@@ -1,20 +1,99 @@
 package response
 
 import (
+	"bytes"
 	"encoding/json"
+	"hash/fnv"
 	"net/http"
+	"strconv"
+	"strings"
+	"sync"
 )
 
-type envelope map[string]any
+// envelope es el cuerpo común de todas las respuestas. Un struct en lugar
+// de map[string]any evita reflejar y ordenar las claves del mapa en cada
+// respuesta; el JSON resultante es el mismo.
+type envelope struct {
+	Data  any    `json:"data"`
+	Error string `json:"error,omitempty"`
+}
+
+// bufPool reutiliza los buffers de codificación entre respuestas.
+var bufPool = sync.Pool{New: func() any { return new(bytes.Buffer) }}
+
+// maxPooledBuf evita que un listado enorme deje un buffer gigante en el pool.
+const maxPooledBuf = 64 << 10
 
 func JSON(w http.ResponseWriter, status int, data any) {
-	w.Header().Set("Content-Type", "application/json")
-	w.WriteHeader(status)
-	_ = json.NewEncoder(w).Encode(envelope{"data": data})
+	write(w, nil, status, envelope{Data: data})
+}
+
+// JSONWithETag es JSON más un ETag débil calculado sobre el cuerpo. Si el
+// cliente ya tiene esa versión (If-None-Match) se responde 304 sin cuerpo:
+// la app vuelve a pedir los mismos recursos muy seguido y así no se
+// retransmiten. Al derivarse del cuerpo, el ETag cambia con cualquier dato
+// de la respuesta sin depender de columnas updated_at.
+func JSONWithETag(w http.ResponseWriter, r *http.Request, status int, data any) {
+	write(w, r, status, envelope{Data: data})
 }
 
 func Error(w http.ResponseWriter, status int, msg string) {
-	w.Header().Set("Content-Type", "application/json")
+	write(w, nil, status, envelope{Error: msg})
+}
+
+// write codifica el cuerpo completo en un buffer antes de enviarlo: así se
+// conoce el Content-Length (sin transfer-encoding chunked en respuestas
+// grandes), se escribe en una sola llamada y, si la codificación falla,
+// todavía se puede responder 500 en lugar de un 200 a medio escribir.
+// Con r != nil una respuesta 200 lleva ETag y puede convertirse en 304.
+func write(w http.ResponseWriter, r *http.Request, status int, body envelope) {
+	buf := bufPool.Get().(*bytes.Buffer)
+	buf.Reset()
+	defer func() {
+		if buf.Cap() <= maxPooledBuf {
+			bufPool.Put(buf)
+		}
+	}()
+
+	// Sin escape HTML: la respuesta es JSON, no se incrusta en una página,
+	// así que reescribir <, > y & como \u003c... sólo cuesta CPU y bytes.
+	enc := json.NewEncoder(buf)
+	enc.SetEscapeHTML(false)
+	if err := enc.Encode(body); err != nil {
+		status = http.StatusInternalServerError
+		buf.Reset()
+		_ = json.NewEncoder(buf).Encode(envelope{Error: "internal error"})
+	}
+
+	h := w.Header()
+	if r != nil && status == http.StatusOK {
+		hash := fnv.New64a()
+		_, _ = hash.Write(buf.Bytes())
+		etag := `W/"` + strconv.FormatUint(hash.Sum64(), 16) + `"`
+		h.Set("ETag", etag)
+		if etagMatch(r.Header.Get("If-None-Match"), etag) {
+			w.WriteHeader(http.StatusNotModified)
+			return
+		}
+	}
+	h.Set("Content-Type", "application/json")
+	h.Set("Content-Length", strconv.Itoa(buf.Len()))
 	w.WriteHeader(status)
-	_ = json.NewEncoder(w).Encode(envelope{"data": nil, "error": msg})
+	_, _ = w.Write(buf.Bytes())
+}
+
+// etagMatch aplica la comparación débil de If-None-Match: acepta una lista
+// separada por comas, "*" y etiquetas con o sin el prefijo W/.
+func etagMatch(header, etag string) bool {
+	if header == "" {
+		return false
+	}
+	etag = strings.TrimPrefix(etag, "W/")
+	for _, candidate := range strings.Split(header, ",") {
+		candidate = strings.TrimSpace(candidate)
+		if candidate == "*" || strings.TrimPrefix(candidate, "W/") == etag {
+			return true
+		}
+	}
+	return false
 }
@@ -0,0 +1,63 @@
+// Package ttlmap implementa el mapa con vencimiento que comparten los
+// cachés en memoria de la API (tokens JWT, negocios y usuarios).
+package ttlmap
+
+import (
+	"sync"
+	"time"
+)
+
+type entry[V any] struct {
+	v       V
+	expires time.Time
+}
+
+// Map guarda cada valor hasta su vencimiento y es seguro para uso
+// concurrente. Para acotar la memoria tiene un máximo de entradas: al
+// llenarse se purgan las vencidas y, si no alcanza, se vacía completo.
+type Map[K comparable, V any] struct {
+	max int
+
+	mu      sync.RWMutex
+	entries map[K]entry[V]
+}
+
+func New[K comparable, V any](max int) *Map[K, V] {
+	return &Map[K, V]{max: max, entries: make(map[K]entry[V])}
+}
+
+// Get devuelve el valor guardado en key si todavía no venció.
+func (m *Map[K, V]) Get(key K) (V, bool) {
+	m.mu.RLock()
+	e, ok := m.entries[key]
+	m.mu.RUnlock()
+	if !ok || !time.Now().Before(e.expires) {
+		var zero V
+		return zero, false
+	}
+	return e.v, true
+}
+
+// Set guarda v en key hasta expires.
+func (m *Map[K, V]) Set(key K, v V, expires time.Time) {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	if len(m.entries) >= m.max {
+		now := time.Now()
+		for k, e := range m.entries {
+			if !now.Before(e.expires) {
+				delete(m.entries, k)
+			}
+		}
+		if len(m.entries) >= m.max {
+			m.entries = make(map[K]entry[V])
+		}
+	}
+	m.entries[key] = entry[V]{v: v, expires: expires}
+}
+
+func (m *Map[K, V]) Delete(key K) {
+	m.mu.Lock()
+	delete(m.entries, key)
+	m.mu.Unlock()
+}
@@ -70,6 +70,7 @@ CREATE TABLE products (
 );
 
 CREATE INDEX idx_products_business ON products(business_id);
+CREATE INDEX idx_products_business_name ON products(business_id, name, id) WHERE active = TRUE;
 
 -- ------------------------------------------------------------
 -- orders
@@ -92,9 +93,12 @@ CREATE TABLE orders (
     CONSTRAINT fk_order_dp       FOREIGN KEY (delivery_point_id) REFERENCES delivery_points(id)
 );
 
-CREATE INDEX idx_orders_buyer    ON orders(buyer_id);
-CREATE INDEX idx_orders_business ON orders(business_id);
-CREATE INDEX idx_orders_status   ON orders(status);
+CREATE INDEX idx_orders_buyer_created_id     ON orders(buyer_id, created_at DESC, id DESC);
+CREATE INDEX idx_orders_business_created_id ON orders(business_id, created_at DESC, id DESC);
+CREATE INDEX idx_orders_status              ON orders(status);
+CREATE INDEX idx_orders_reserved_deadline ON orders(pickup_deadline)
+    WHERE type = 'reserved' AND status IN ('reserved','ready');
+CREATE INDEX idx_orders_qr_code             ON orders(qr_code) WHERE qr_code IS NOT NULL;
 
 -- ------------------------------------------------------------
 -- order_items